@@ -6,6 +6,9 @@ from .category import router as category_router
 from .offer import router as offer_router
 from .auth import router as login_router
 from .mail_service import router as mail_router
+from .image import router as image_router
+from .qr import router as qr_router
+from .search import router as search_router
 
 router = APIRouter(prefix="/v1")
 
@@ -16,3 +19,6 @@ router.include_router(business_router)
 router.include_router(category_router)
 router.include_router(offer_router)
 router.include_router(mail_router)
+router.include_router(image_router)
+router.include_router(qr_router)
+router.include_router(search_router)
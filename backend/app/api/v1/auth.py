@@ -4,10 +4,12 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 from starlette import status
 
+from app.api.v1.category_service import add_user_categories, resolve_categories
 from app.api.v1.schemas.schemas import BusinessRead, CustomerRead, UserRead, UserCreate, CategoryRead
 from app.core.db import db_dep
-from app.core.security import authenticate_user, create_access_token, get_password_hash
-from app.model.model import User, Category, Business, Customer
+from app.core.logger import logger
+from app.core.security import authenticate_user, create_access_token, password_hasher
+from app.model.model import User, Business, Customer
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -26,6 +28,9 @@ async def login(db: db_dep, form_data: OAuth2PasswordRequestForm = Depends()):
             hot_line=db_user.business.hot_line,
             targeted_gender=db_user.business.targeted_gender,
             cover_photo=db_user.business.cover_photo,
+            cover_photo_variants=db_user.business.cover_photo_variants,
+            latitude=db_user.business.latitude,
+            longitude=db_user.business.longitude,
             start_hour=db_user.business.start_hour,
             close_hour=db_user.business.close_hour,
             opening_days=db_user.business.opening_days,
@@ -48,6 +53,7 @@ async def login(db: db_dep, form_data: OAuth2PasswordRequestForm = Depends()):
         phone_number=db_user.phone_number,
         address=db_user.address,
         profile_photo=db_user.profile_photo,
+        profile_photo_variants=db_user.profile_photo_variants,
         categories=[
             CategoryRead(id=c.id, name=c.name, key=c.key)
             for c in db_user.categories
@@ -77,21 +83,10 @@ async def create_user(user: UserCreate, is_business: bool, db: db_dep):
             )
 
         # Validate categories
-        categories = []
-        if user.categories:
-            for cat_id in user.categories:
-                category = await db.execute(
-                    select(Category).filter(Category.id == cat_id)
-                )
-                category = category.scalars().first()
-                if not category:
-                    raise HTTPException(
-                        status_code=404, detail=f"Category {cat_id} not found"
-                    )
-                categories.append(category)
+        categories = await resolve_categories(db, user.categories or [])
 
         # Hash the password
-        hashed_password = get_password_hash(user.password)
+        hashed_password = await password_hasher.hash(user.password)
 
         # Create user with hashed password
         db_user = User(
@@ -102,9 +97,9 @@ async def create_user(user: UserCreate, is_business: bool, db: db_dep):
         else:
             db_user.customer = Customer(**user.customer.model_dump())
 
-        db_user.categories = categories
-
         db.add(db_user)
+        await db.flush()
+        await add_user_categories(db, db_user.id, [c.id for c in categories])
         await db.commit()
         await db.refresh(db_user)
 
@@ -116,6 +111,9 @@ async def create_user(user: UserCreate, is_business: bool, db: db_dep):
                 hot_line=db_user.business.hot_line,
                 targeted_gender=db_user.business.targeted_gender,
                 cover_photo=db_user.business.cover_photo,
+                cover_photo_variants=db_user.business.cover_photo_variants,
+                latitude=db_user.business.latitude,
+                longitude=db_user.business.longitude,
                 start_hour=db_user.business.start_hour,
                 close_hour=db_user.business.close_hour,
                 opening_days=db_user.business.opening_days
@@ -137,6 +135,7 @@ async def create_user(user: UserCreate, is_business: bool, db: db_dep):
             phone_number=db_user.phone_number,
             address=db_user.address,
             profile_photo=db_user.profile_photo,
+            profile_photo_variants=db_user.profile_photo_variants,
             categories=[
                 CategoryRead(id=c.id, name=c.name, key=c.key)
                 for c in db_user.categories
@@ -146,6 +145,6 @@ async def create_user(user: UserCreate, is_business: bool, db: db_dep):
         )
 
     except Exception as e:
-        print(e)
+        logger.error(f"Signup failed: {e}")
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
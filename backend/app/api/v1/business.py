@@ -1,16 +1,24 @@
 from uuid import UUID
-from fastapi import APIRouter, status
-from typing import List, Optional
-from pydantic import BaseModel, EmailStr
-
-from app.model.model import Business, Category, User
-from app.core.db import db_dep
-from sqlalchemy.orm import selectinload
+from fastapi import APIRouter, Query, status
+from typing import List, Literal, Optional
+from pydantic import BaseModel, EmailStr, Field
+
+from app.model.model import Business, User
+from app.core.config import settings
+from app.core.db import db_dep, read_db_dep
+from app.core.read_cache import read_cache
+from app.core.security import password_hasher
+from sqlalchemy import Float, func
+from sqlalchemy.orm import joinedload, lazyload, selectinload
 from datetime import time
 from .category import (
     CategoryRead,
 )  # Assuming you have CategoryRead schema in category.py
+from .category_service import add_user_categories, resolve_categories, set_user_categories
 from .dependencies import auth_dep
+from .pagination import keyset, make_page, page_dep, reject_paging
+from .schemas.schemas import Page
+from .streaming import ndjson_response
 
 router = APIRouter(prefix="/businesses", tags=["Businesses"])
 
@@ -29,6 +37,8 @@ class BusinessCreate(BaseModel):
     start_hour: Optional[str] = None
     close_hour: Optional[str] = None
     opening_days: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     categories: List[UUID]
 
 
@@ -45,6 +55,8 @@ class BusinessUpdate(BaseModel):
     start_hour: Optional[time] = None
     close_hour: Optional[time] = None
     opening_days: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     categories: List[UUID]
 
 
@@ -63,11 +75,19 @@ class BusinessRead(BaseModel):
     opening_days: Optional[str]
     categories: List[UUID]
     photos: Optional[str]
+    cover_photo_variants: Optional[dict[str, str]] = None
+    profile_photo_variants: Optional[dict[str, str]] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
     class Config:
         from_attributes = True
 
 
+class NearbyBusinessRead(BusinessRead):
+    distance_m: float
+
+
 # --- ROUTES ---
 
 
@@ -75,152 +95,179 @@ class BusinessRead(BaseModel):
 async def create_business(business: BusinessCreate, db: db_dep):
     try:
         # Ensure categories are valid
-        if business.categories:
-            categories = []
-            for cat_id in business.categories:
-                # Check if category exists in the DB
-                category = await db.execute(
-                    select(Category).filter(Category.id == cat_id)
-                )
-                category = category.scalars().first()
-                if not category:
-                    raise HTTPException(
-                        status_code=404, detail=f"Category {cat_id} not found."
-                    )
-                categories.append(category)
-        else:
+        if not business.categories:
             raise HTTPException(status_code=400, detail="Categories are required.")
+        categories = await resolve_categories(db, business.categories)
 
-        # Create the business without categories initially
-        db_business = Business(
-            **business.model_dump(exclude={"categories"}),
+        existing = await db.execute(
+            select(User.id).filter(
+                (User.email == business.email) | (User.username == business.email)
+            )
+        )
+        if existing.first():
+            raise HTTPException(status_code=400, detail="Email already exists")
+
+        # The owning user carries the login, contact details and categories;
+        # the business row only its own columns.
+        db_user = User(
+            email=business.email,
+            username=business.email,
+            password=await password_hasher.hash(business.password),
+            phone_number=business.phone_number,
+            profile_photo=business.profile_photo,
+        )
+        db_user.business = Business(
+            **business.model_dump(
+                exclude={"email", "password", "phone_number", "profile_photo", "categories"}
+            )
         )
 
-        db.add(db_business)
+        # Create both rows, then link the categories in the same transaction
+        db.add(db_user)
+        await db.flush()
+        await add_user_categories(db, db_user.id, [c.id for c in categories])
         await db.commit()
-        await db.refresh(db_business)
-
-        # Now assign categories to the business after it is created
-        db_business.categories = categories
-        await db.merge(db_business)
-        await db.commit()  # Assign categories after the business is created
-
-        # Create the response
-        return BusinessRead(
-            id=db_business.id,
-            email=db_business.email,
-            branch_name=db_business.branch_name,
-            phone_number=db_business.phone_number,
-            hot_line=db_business.hot_line,
-            address=db_business.address,
-            targeted_gender=db_business.targeted_gender,
-            cover_photo=db_business.cover_photo,
-            photos=db_business.photos,
-            profile_photo=db_business.profile_photo,
-            start_hour=db_business.start_hour.strftime("%H:%M:%S")
-            if db_business.start_hour
-            else None,
-            close_hour=db_business.close_hour.strftime("%H:%M:%S")
-            if db_business.close_hour
-            else None,
-            opening_days=db_business.opening_days,
-            categories=[
-                CategoryRead(
-                    id=cat.id,
-                    key=cat.key,
-                    name=cat.name,
-                )
-                for cat in db_business.categories
-            ],
+
+        result = await db.execute(
+            select(Business)
+            .options(_business_options())
+            .filter(Business.id == db_user.business.id)
+            .execution_options(populate_existing=True)
         )
+        return _to_business_read(result.unique().scalars().one())
 
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[BusinessRead], dependencies=[])
-async def list_businesses(db: db_dep):
-    # Step 1: Fetch businesses
-    result = await db.execute(select(Business))
-    businesses = result.scalars().all()
-
-    # Step 2: Fetch user_id → categories for each business
-    response = []
-    for b in businesses:
-        # Fetch categories for this business's user
-        cat_result = await db.execute(
-            select(Category).join(User.categories).where(User.id == b.user_id)
-        )
-        categories = cat_result.scalars().all()
-
-        user = await db.execute(select(User).filter(User.id == b.user_id))
-        user = user.scalars().first()
-
-        # Build the response
-        response.append(
-            BusinessRead(
-                id=b.id,
-                email=user.email if user else None,
-                branch_name=b.branch_name,
-                phone_number=user.phone_number if user else None,
-                hot_line=b.hot_line,
-                address=b.address,
-                targeted_gender=b.targeted_gender,
-                cover_photo=b.cover_photo,
-                photos=b.photos,
-                profile_photo=user.profile_photo if user else None,
-                start_hour=b.start_hour if b.start_hour else None,
-                close_hour=b.close_hour if b.close_hour else None,
-                opening_days=b.opening_days,
-                categories=[
-                    CategoryRead(id=c.id, key=c.key, name=c.name) for c in categories
-                ],
+def _business_options():
+    # Business -> User -> Category in a single round trip; the other joined
+    # relationships on User are not needed to build a BusinessRead.
+    return joinedload(Business.user).options(
+        joinedload(User.categories),
+        lazyload(User.business),
+        lazyload(User.customer),
+    )
+
+
+def _to_business_read(b: Business) -> BusinessRead:
+    user = b.user
+    return BusinessRead(
+        id=b.id,
+        email=user.email if user else None,
+        branch_name=b.branch_name,
+        phone_number=user.phone_number if user else None,
+        hot_line=b.hot_line,
+        address=b.address,
+        targeted_gender=b.targeted_gender,
+        cover_photo=b.cover_photo,
+        cover_photo_variants=b.cover_photo_variants,
+        photos=b.photos,
+        profile_photo=user.profile_photo if user else None,
+        profile_photo_variants=user.profile_photo_variants if user else None,
+        start_hour=b.start_hour if b.start_hour else None,
+        close_hour=b.close_hour if b.close_hour else None,
+        opening_days=b.opening_days,
+        categories=[c.id for c in user.categories] if user else [],
+        latitude=b.latitude,
+        longitude=b.longitude,
+    )
+
+
+@router.get("/", response_model=Page[BusinessRead], dependencies=[])
+async def list_businesses(
+    db: read_db_dep, page: page_dep, format: Literal["json", "ndjson"] = "json"
+):
+    if format == "ndjson":
+        reject_paging(page)
+        # Joined collection loading cannot be combined with yield_per.
+        stmt = (
+            select(Business)
+            .options(
+                selectinload(Business.user).options(
+                    selectinload(User.categories),
+                    lazyload(User.business),
+                    lazyload(User.customer),
+                )
             )
+            .order_by(Business.id)
         )
-
-    return response
-
-
-@router.get("/{business_id}", response_model=BusinessRead)
-async def get_business_by_id(business_id: UUID, db: db_dep):
-    try:
-        result = await db.execute(select(Business).filter(Business.id == business_id))
-        db_business = result.scalars().first()
+        return ndjson_response(stmt, _to_business_read)
+
+    stmt = keyset(select(Business).options(_business_options()), page, Business.id)
+    result = await db.execute(stmt)
+    businesses = result.unique().scalars().all()
+    return make_page(businesses, page, lambda b: (b.id,), _to_business_read)
+
+
+@router.get("/nearby", response_model=List[NearbyBusinessRead])
+async def list_nearby_businesses(
+    db: read_db_dep,
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(5, gt=0, le=100),
+    limit: int = Query(20, ge=1, le=100),
+):
+    # earth_box prefilters through the GiST index on ll_to_earth(latitude,
+    # longitude) and <-> walks that same index nearest-first; earth_distance
+    # trims the box corners down to the real radius.
+    origin = func.ll_to_earth(lat, lng)
+    location = func.ll_to_earth(Business.latitude, Business.longitude)
+    radius_m = radius_km * 1000
+    distance = func.earth_distance(origin, location, type_=Float)
+    stmt = (
+        select(Business, distance.label("distance_m"))
+        .options(_business_options())
+        .where(
+            Business.latitude.is_not(None),
+            Business.longitude.is_not(None),
+            func.earth_box(origin, radius_m).op("@>")(location),
+            distance <= radius_m,
+        )
+        .order_by(location.op("<->")(origin))
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return [
+        NearbyBusinessRead(
+            **_to_business_read(row.Business).model_dump(),
+            distance_m=row.distance_m,
+        )
+        for row in result.unique().all()
+    ]
+
+
+@router.get(
+    "/{business_id}",
+    response_model=BusinessRead,
+)
+async def get_business_by_id(business_id: UUID, db: read_db_dep):
+    async def load():
+        result = await db.execute(
+            select(Business)
+            .options(_business_options())
+            .filter(Business.id == business_id)
+        )
+        db_business = result.unique().scalars().first()
 
         if not db_business:
             raise HTTPException(status_code=404, detail="Business not found")
 
-        # get user_id
-        user_id = db_business.user_id
-        fetch_user = await db.execute(select(User).filter(User.id == user_id))
-        user = fetch_user.scalars().first()
-
-        # Fetch categories for this user
-        cat_result = await db.execute(
-            select(Category).join(User.categories).where(User.id == user_id)
-        )
+        return _to_business_read(db_business)
 
-        return BusinessRead(
-            id=db_business.id,
-            email=user.email if user else None,
-            branch_name=db_business.branch_name,
-            phone_number=user.phone_number if user else None,
-            hot_line=db_business.hot_line,
-            address=db_business.address,
-            targeted_gender=db_business.targeted_gender,
-            cover_photo=db_business.cover_photo,
-            photos=db_business.photos,
-            profile_photo=user.profile_photo if user else None,
-            start_hour=db_business.start_hour if db_business.start_hour else None,
-            close_hour=db_business.close_hour if db_business.close_hour else None,
-            opening_days=db_business.opening_days,
-            categories=[
-                CategoryRead(id=c.id, key=c.key, name=c.name)
-                for c in cat_result.scalars().all()
-            ],
+    try:
+        return await read_cache.fetch(
+            "businesses",
+            business_id,
+            BusinessRead,
+            load,
+            ttl=settings.CACHE_BUSINESS_TTL,
+            cache_control="public, max-age=60",
         )
-
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -246,51 +293,23 @@ async def update_business(business_id: UUID, update: BusinessUpdate, db: db_dep)
         for key, value in update_data.items():
             setattr(business, key, value)
 
-        # Handle categories if provided
-        if hasattr(update, "categories") and update.categories is not None:
-            categories = []
-            for cat_id in update.categories:
-                # Check if the category exists in the DB
-                category = await db.execute(
-                    select(Category).filter(Category.id == cat_id)
-                )
-                category = category.scalars().first()
-                if not category:
-                    raise HTTPException(
-                        status_code=404, detail=f"Category {cat_id} not found."
-                    )
-                categories.append(category)
-
-            # Assign the valid categories to the business
-            business.categories = categories
+        # Handle categories if provided; they are stored on the owning user
+        if update.categories is not None:
+            await set_user_categories(db, business.user_id, update.categories)
 
-        # Commit changes to the database and refresh the business object
+        # Commit changes to the database
         await db.commit()
-        await db.refresh(business)
-
-        # Return the updated business object
-        return BusinessRead(
-            id=business.id,
-            email=business.email,
-            branch_name=business.branch_name,
-            phone_number=business.phone_number,
-            hot_line=business.hot_line,
-            address=business.address,
-            targeted_gender=business.targeted_gender,
-            cover_photo=business.cover_photo,
-            profile_photo=business.profile_photo,
-            start_hour=business.start_hour.strftime("%H:%M:%S")
-            if business.start_hour
-            else None,
-            close_hour=business.close_hour.strftime("%H:%M:%S")
-            if business.close_hour
-            else None,
-            opening_days=business.opening_days,
-            categories=[
-                CategoryRead(id=cat.id, key=cat.key, name=cat.name)
-                for cat in business.categories
-            ],
+        await read_cache.invalidate("businesses", business.id)
+        await read_cache.invalidate("users", business.user_id)
+
+        # Reload with the owning user, whose categories were just rewritten
+        result = await db.execute(
+            select(Business)
+            .options(_business_options())
+            .filter(Business.id == business_id)
+            .execution_options(populate_existing=True)
         )
+        return _to_business_read(result.unique().scalars().one())
 
     except Exception as e:
         # If there is any error during commit or refresh, rollback and raise an HTTPException
@@ -308,6 +327,8 @@ async def delete_business(business_id: UUID, db: db_dep):
         raise HTTPException(status_code=404, detail="Business not found")
     await db.delete(business)
     await db.commit()
+    await read_cache.invalidate("businesses", business.id)
+    await read_cache.invalidate("users", business.user_id)
     return {"deleted": "success"}
 
 
@@ -321,7 +342,7 @@ class BusinessIdResponse(BaseModel):
 
 # --- ROUTES ---
 @router.get("/user/{user_id}", response_model=BusinessIdResponse)
-async def get_business_by_user_id(user_id: UUID, db: db_dep):
+async def get_business_by_user_id(user_id: UUID, db: read_db_dep):
     """
     Get business ID by user ID
     """
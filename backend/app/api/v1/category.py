@@ -4,9 +4,12 @@ from sqlalchemy import select
 from typing import List
 
 from app.api.v1.dependencies import auth_dep
-from app.api.v1.schemas.schemas import CategoryRead, CategoryCreate
+from app.api.v1.pagination import keyset, make_page, page_dep
+from app.api.v1.schemas.schemas import CategoryRead, CategoryCreate, Page
 from app.model.model import Category  # Assuming you have Category model here
-from app.core.db import db_dep
+from app.core.config import settings
+from app.core.db import db_dep, read_db_dep
+from app.core.read_cache import read_cache
 
 router = APIRouter(prefix="/categories", tags=["Categories"], dependencies=[auth_dep])
 
@@ -25,25 +28,53 @@ async def create_category(category: CategoryCreate, db: db_dep):
         db.add(db_category)
         await db.commit()
         await db.refresh(db_category)
+        await read_cache.invalidate("categories")
         return db_category
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[CategoryRead])
-async def list_categories(db: db_dep):
-    result = await db.execute(select(Category))
-    return result.scalars().all()
+@router.get(
+    "/",
+    response_model=Page[CategoryRead],
+)
+async def list_categories(db: read_db_dep, page: page_dep):
+    async def load():
+        result = await db.execute(keyset(select(Category), page, Category.id))
+        categories = result.scalars().all()
+        return make_page(categories, page, lambda c: (c.id,), CategoryRead.model_validate)
 
+    return await read_cache.fetch(
+        "categories",
+        f"list:{page.limit}:{page.cursor}",
+        Page[CategoryRead],
+        load,
+        ttl=settings.CACHE_CATEGORY_TTL,
+        cache_control="private, max-age=300",
+    )
 
-@router.get("/{category_id}", response_model=CategoryRead)
-async def get_category(category_id: UUID, db: db_dep):
-    result = await db.execute(select(Category).filter(Category.id == category_id))
-    category = result.scalars().first()
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-    return category
+
+@router.get(
+    "/{category_id}",
+    response_model=CategoryRead,
+)
+async def get_category(category_id: UUID, db: read_db_dep):
+    async def load():
+        result = await db.execute(select(Category).filter(Category.id == category_id))
+        category = result.scalars().first()
+        if not category:
+            raise HTTPException(status_code=404, detail="Category not found")
+        return category
+
+    return await read_cache.fetch(
+        "categories",
+        category_id,
+        CategoryRead,
+        load,
+        ttl=settings.CACHE_CATEGORY_TTL,
+        cache_control="private, max-age=300",
+    )
 
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -55,4 +86,8 @@ async def delete_category(category_id: UUID, db: db_dep):
 
     await db.delete(category)
     await db.commit()
+    # Business and user reads embed their categories
+    await read_cache.invalidate("categories")
+    await read_cache.invalidate("businesses")
+    await read_cache.invalidate("users")
     return {"detail": "Category deleted successfully."}
@@ -0,0 +1,75 @@
+from typing import Iterable
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import any_, bindparam, delete, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PgUUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.model.model import Category, user_category
+
+
+def _unique(category_ids: Iterable[UUID]) -> list[UUID]:
+    return list(dict.fromkeys(category_ids))
+
+
+async def resolve_categories(db: AsyncSession, category_ids: Iterable[UUID]) -> list[Category]:
+    """Load the given categories in one query, in request order.
+
+    Raises 404 naming every ID that does not exist.
+    """
+    ids = _unique(category_ids)
+    if not ids:
+        return []
+    result = await db.execute(
+        select(Category).where(
+            Category.id == any_(bindparam("category_ids", ids, type_=ARRAY(PgUUID)))
+        )
+    )
+    found = {category.id: category for category in result.scalars()}
+    missing = [str(category_id) for category_id in ids if category_id not in found]
+    if missing:
+        raise HTTPException(
+            status_code=404, detail=f"Categories not found: {', '.join(missing)}"
+        )
+    return [found[category_id] for category_id in ids]
+
+
+async def add_user_categories(db: AsyncSession, user_id: UUID, category_ids: Iterable[UUID]):
+    """Link categories to a user in a single INSERT; existing links are kept."""
+    ids = _unique(category_ids)
+    if not ids:
+        return
+    await db.execute(
+        pg_insert(user_category)
+        .values([{"user_id": user_id, "category_id": category_id} for category_id in ids])
+        .on_conflict_do_nothing()
+    )
+
+
+async def set_user_categories(db: AsyncSession, user_id: UUID, category_ids: Iterable[UUID]):
+    """Make `category_ids` the user's exact category set.
+
+    All IDs are validated up front; only the difference from the stored set
+    is written, so unchanged links are neither deleted nor re-inserted.
+    The ORM `User.categories` collection is stale afterwards until the user
+    is refreshed.
+    """
+    wanted = {category.id for category in await resolve_categories(db, category_ids)}
+    result = await db.execute(
+        select(user_category.c.category_id).where(user_category.c.user_id == user_id)
+    )
+    current = set(result.scalars())
+
+    removed = current - wanted
+    if removed:
+        await db.execute(
+            delete(user_category).where(
+                user_category.c.user_id == user_id,
+                user_category.c.category_id
+                == any_(bindparam("removed_ids", list(removed), type_=ARRAY(PgUUID))),
+            )
+        )
+    await add_user_categories(db, user_id, wanted - current)
@@ -0,0 +1,75 @@
+import hashlib
+from typing import Any, Awaitable, Callable
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import Select, func, select
+
+from app.core.db import read_db_dep
+from app.core.middleware import if_none_match, weak_etag
+from app.model.model import BusinessOffer
+
+Version = Callable[[Request, Any], Awaitable[Any]]
+
+
+def conditional(version: Version, cache_control: str = "private, no-cache"):
+    """Dependency answering `If-None-Match` from row versions alone.
+
+    `version(request, db)` returns something that changes whenever the
+    response would; when the client already holds that version the request
+    ends with 304 before the handler loads or serializes anything. The
+    ETag and Cache-Control headers are added to normal responses by
+    `ConditionalRequestMiddleware`.
+
+    Only for handlers that read the database directly: a response served
+    from `read_cache` may be older than the row version, so those routes
+    take their ETag from the cached body instead.
+    """
+
+    async def dependency(request: Request, db: read_db_dep):
+        current = await version(request, db)
+        if current is None:
+            return  # Let the handler produce its 404
+        etag = weak_etag(hashlib.sha1(repr(current).encode()).hexdigest())
+        request.state.etag = etag
+        request.state.cache_control = cache_control
+        if etag in if_none_match(request.headers):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": cache_control},
+            )
+
+    return Depends(dependency)
+
+
+def _path_uuid(request: Request, name: str) -> UUID:
+    return UUID(request.path_params[name])
+
+
+def _row_version(stmt: Callable[[Request], Select]) -> Version:
+    async def version(request: Request, db) -> Any:
+        try:
+            query = stmt(request)
+        except ValueError:
+            return None  # Malformed id, left to the handler's validation
+        return (await db.execute(query)).first()
+
+    return version
+
+
+offer_version = _row_version(
+    lambda request: select(BusinessOffer.updated_at).where(
+        BusinessOffer.id == _path_uuid(request, "offer_id")
+    )
+)
+
+
+# max(updated_at) and count(*) catch most changes; the sum also catches a
+# change that commits after a later-stamped one, which leaves the max alone.
+business_offers_version = _row_version(
+    lambda request: select(
+        func.max(BusinessOffer.updated_at),
+        func.count(),
+        func.sum(func.extract("epoch", BusinessOffer.updated_at)),
+    ).where(BusinessOffer.business_id == _path_uuid(request, "business_id"))
+)
@@ -0,0 +1,31 @@
+import asyncio
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import RedirectResponse
+
+from app.core.images import variant_url
+from app.core.uploads import url_to_path
+
+router = APIRouter(prefix="/images", tags=["Images"])
+
+
+@router.get("/variant")
+async def get_image_variant(
+    src: str,
+    size: Literal["thumb", "medium", "original"] = "original",
+    format: Literal["original", "webp"] = "original",
+):
+    """
+    Redirect to the requested size/format of an uploaded image.
+
+    Falls back to the original upload while derivatives are still rendering.
+    """
+    if not src.startswith("/uploads/") or ".." in src:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid image path"
+        )
+    target = variant_url(src, size, format)
+    if not await asyncio.to_thread(url_to_path(target).exists):
+        target = src
+    return RedirectResponse(target, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
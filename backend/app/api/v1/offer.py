@@ -1,28 +1,36 @@
 from uuid import UUID
 from fastapi import APIRouter, HTTPException, status, Query, Depends
-from sqlalchemy import select
-from typing import List, Optional
+from sqlalchemy import and_, exists, func, literal, select
+from sqlalchemy.dialects.postgresql import UUID as PgUUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import List, Literal, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
-from app.api.v1.dependencies import auth_dep
-from app.model.model import BusinessOffer  # Adjust the path if needed
-from app.core.db import db_dep  # Your db dependency
+from app.api.v1.conditional import business_offers_version, conditional, offer_version
+from app.api.v1.dependencies import auth_dep, current_user_dep
+from app.api.v1.pagination import keyset, make_page, page_dep, reject_paging
+from app.api.v1.schemas.schemas import Page
+from app.api.v1.streaming import ndjson_response
+from app.model.model import BusinessOffer, OfferFeed, OfferRedemption  # Adjust the path if needed
+from app.core.db import db_dep, read_db_dep  # Your db dependency
+from app.core.images import existing_variants, image_processor
+from app.core.qr import qr_renderer
+from app.core.uploads import store_upload
 
 from fastapi import UploadFile, File, Form
+import asyncio
 import uuid
 from pathlib import Path
-import os
-import qrcode
+from .qr import qr_code_path, redemption_url
 
 router = APIRouter(prefix="/offers", tags=["Offers"], dependencies=[auth_dep])
 
-def generate_qr_code(data: str, filename: str, save_dir="static/qrcodes") -> str:
-    os.makedirs(save_dir, exist_ok=True)
-    file_path = os.path.join(save_dir, f"{filename}.png")
-    img = qrcode.make(data)
-    img.save(file_path)
-    return file_path
+# "active": valid now; "ending_soon": active and ending within `within_hours`;
+# "upcoming": not started yet.
+OfferWindow = Literal["active", "ending_soon", "upcoming"]
+# Upper bound for `within_hours`; larger values would overflow make_interval.
+MAX_WITHIN_HOURS = 24 * 30
 
 
 # --- SCHEMAS ---
@@ -51,6 +59,7 @@ class OfferRead(BaseModel):
     start_date: datetime
     end_date: datetime
     photo: Optional[str]
+    photo_variants: Optional[dict[str, str]] = None
     qr_code_path: Optional[str]
 
     class Config:
@@ -64,33 +73,89 @@ async def create_offer(offer: OfferCreate, db: db_dep):
     # try:
         # Create the offer
     db_offer = BusinessOffer(**offer.dict())
+    db_offer.photo_variants = await asyncio.to_thread(existing_variants, db_offer.photo)
     db_offer.redemption_code = uuid.uuid4().hex  # Unique redemption code
+    # The QR image is rendered on demand by the qrcodes router
+    db_offer.qr_code_path = qr_code_path(db_offer.redemption_code)
 
     db.add(db_offer)
-    await db.flush()  # to get db_offer.id
-
-    # Generate the QR code
-    qr_data = f"http://localhost:8000/redeem/{db_offer.redemption_code}"
-    qr_filename = str(db_offer.id)
-    qr_relative_path = generate_qr_code(data=qr_data, filename=qr_filename)
-    db_offer.qr_code_path = "/" + qr_relative_path.replace("\\", "/")  # Ensure UNIX-style path
-
     await db.commit()
     await db.refresh(db_offer)
+
+    # Warm the render cache without holding up the response
+    qr_renderer.prefetch(redemption_url(db_offer.redemption_code))
     return db_offer
     # except Exception as e:
     #     await db.rollback()
     #     raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[OfferRead])
-async def list_offers(db: db_dep):
-    result = await db.execute(select(BusinessOffer))
-    return result.scalars().all()
+def _offers_in_window(when: Optional[OfferWindow], within_hours: int):
+    # Each window pages on the (date, id) index that bounds it, so historical
+    # offers are never scanned.
+    now = func.now()
+    stmt = select(BusinessOffer)
+    if when is None:
+        return stmt, (BusinessOffer.id,)
+    if when == "upcoming":
+        stmt = stmt.where(BusinessOffer.start_date > now)
+        return stmt, (BusinessOffer.start_date, BusinessOffer.id)
+    stmt = stmt.where(BusinessOffer.end_date >= now, BusinessOffer.start_date <= now)
+    if when == "ending_soon":
+        stmt = stmt.where(
+            BusinessOffer.end_date <= now + func.make_interval(0, 0, 0, 0, within_hours)
+        )
+    return stmt, (BusinessOffer.end_date, BusinessOffer.id)
+
+
+@router.get("/", response_model=Page[OfferRead])
+async def list_offers(
+    db: read_db_dep,
+    page: page_dep,
+    format: Literal["json", "ndjson"] = "json",
+    when: Optional[OfferWindow] = None,
+    within_hours: int = Query(48, ge=1, le=MAX_WITHIN_HOURS),
+):
+    stmt, order = _offers_in_window(when, within_hours)
+    if format == "ndjson":
+        reject_paging(page)
+        return ndjson_response(stmt.order_by(*order), OfferRead.model_validate)
+
+    result = await db.execute(keyset(stmt, page, *order))
+    offers = result.scalars().all()
+    return make_page(
+        offers,
+        page,
+        lambda o: tuple(getattr(o, column.key) for column in order),
+        OfferRead.model_validate,
+    )
+
+
+@router.get("/feed", response_model=Page[OfferRead])
+async def get_offer_feed(user: current_user_dep, db: read_db_dep, page: page_dep):
+    # offer_feed is kept current by triggers on categories, offers, targeting
+    # and customer profiles, so this is one index range scan on
+    # (user_id, -score, offer_id) plus primary-key joins.
+    rank = -OfferFeed.score
+    stmt = (
+        select(BusinessOffer, rank.label("rank"))
+        .join(OfferFeed, OfferFeed.offer_id == BusinessOffer.id)
+        .where(OfferFeed.user_id == UUID(user["id"]), OfferFeed.end_date >= func.now())
+    )
+    result = await db.execute(keyset(stmt, page, rank, OfferFeed.offer_id))
+    rows = result.all()
+    return make_page(
+        rows,
+        page,
+        lambda row: (row.rank, row.BusinessOffer.id),
+        lambda row: OfferRead.model_validate(row.BusinessOffer),
+    )
 
 
-@router.get("/{offer_id}", response_model=OfferRead)
-async def get_offer(offer_id: UUID, db: db_dep):
+@router.get(
+    "/{offer_id}", response_model=OfferRead, dependencies=[conditional(offer_version)]
+)
+async def get_offer(offer_id: UUID, db: read_db_dep):
     result = await db.execute(
         select(BusinessOffer).filter(BusinessOffer.id == offer_id)
     )
@@ -111,6 +176,8 @@ async def update_offer(offer_id: UUID, offer_update: OfferUpdate, db: db_dep):
 
     for key, value in offer_update.dict(exclude_unset=True).items():
         setattr(offer, key, value)
+    if "photo" in offer_update.model_fields_set:
+        offer.photo_variants = await asyncio.to_thread(existing_variants, offer.photo)
 
     try:
         await db.commit()
@@ -136,32 +203,27 @@ async def delete_offer(offer_id: UUID, db: db_dep):
 
 @router.post("/upload-photo-offer", status_code=status.HTTP_200_OK)
 async def upload_offer_photo(file: UploadFile = File(...)):
-    # Create general upload directory for offers
-    upload_dir = Path("uploads") / "offers"
-    upload_dir.mkdir(parents=True, exist_ok=True)
+    # Save the file in the content-addressed store
+    relative_path, size, checksum = await store_upload(file)
 
-    # Generate unique filename
-    file_ext = file.filename.split(".")[-1]
-    unique_filename = f"{uuid.uuid4().hex}.{file_ext}"
-    file_path = upload_dir / unique_filename
-
-    # Save the file
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
-
-    # Construct relative URL path
-    relative_path = f"/uploads/offers/{unique_filename}"
+    image_processor.schedule(relative_path, BusinessOffer.photo)
 
     return {
         "message": "Offer photo uploaded successfully",
         "file_path": relative_path,
-        "type": "offer"
+        "type": "offer",
+        "size": size,
+        "sha256": checksum
     }
 
-@router.get("/business/{business_id}", response_model=List[OfferRead])
+@router.get(
+    "/business/{business_id}",
+    response_model=List[OfferRead],
+    dependencies=[conditional(business_offers_version)],
+)
 async def get_offers_by_business_id(
     business_id: UUID,
-    db: db_dep,
+    db: read_db_dep,
 ):
     result = await db.execute(
         select(BusinessOffer).filter(BusinessOffer.business_id == business_id)
@@ -171,10 +233,46 @@ async def get_offers_by_business_id(
         raise HTTPException(status_code=404, detail="No offers found for this business ID")
     return offers
 
+def _redeem_statement(code: str, user_id: UUID):
+    # Looks the offer up, checks its validity window and records the redemption
+    # in one statement; the unique (offer_id, user_id) constraint makes the
+    # insert single-use even under concurrent scans.
+    now = func.now()
+    offer = (
+        select(
+            BusinessOffer.id,
+            BusinessOffer.name,
+            and_(BusinessOffer.start_date <= now, BusinessOffer.end_date >= now).label("active"),
+        )
+        .where(BusinessOffer.redemption_code == code)
+        .cte("offer")
+    )
+    redemption = (
+        pg_insert(OfferRedemption)
+        .from_select(
+            ["offer_id", "user_id"],
+            select(offer.c.id, literal(user_id, PgUUID)).where(offer.c.active),
+        )
+        .on_conflict_do_nothing(constraint="uq_offer_redemption_offer_user")
+        .returning(OfferRedemption.offer_id)
+        .cte("redemption")
+    )
+    return select(
+        offer.c.name,
+        offer.c.active,
+        exists(select(redemption.c.offer_id)).label("redeemed"),
+    )
+
+
 @router.get("/redeem/{code}")
-async def redeem_offer(code: str, db: db_dep):
-    result = await db.execute(select(BusinessOffer).filter_by(redemption_code=code))
-    offer = result.scalars().first()
-    if not offer:
+async def redeem_offer(code: str, user: current_user_dep, db: db_dep):
+    result = await db.execute(_redeem_statement(code, UUID(user["id"])))
+    row = result.first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Invalid or expired QR code")
-    return {"message": f"Offer '{offer.name}' redeemed successfully!"}
+    if not row.active:
+        raise HTTPException(status_code=410, detail="This offer is not valid at this time")
+    if not row.redeemed:
+        raise HTTPException(status_code=409, detail="Offer already redeemed")
+    await db.commit()
+    return {"message": f"Offer '{row.name}' redeemed successfully!"}
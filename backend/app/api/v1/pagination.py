@@ -0,0 +1,91 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Annotated, Any, Callable, Optional, Sequence
+
+from fastapi import Depends, HTTPException, Query, Request
+from sqlalchemy import Select, tuple_
+
+from .schemas.schemas import Page
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class PageParams:
+    def __init__(
+        self,
+        request: Request,
+        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+        cursor: Optional[str] = Query(None),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        # Whether the client asked for a page, as opposed to the default one
+        self.requested = cursor is not None or "limit" in request.query_params
+
+
+page_dep = Annotated[PageParams, Depends(PageParams)]
+
+
+def _encode_value(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps([_encode_value(v) for v in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> list[Any]:
+    """Decode an opaque cursor back into typed values for the keyset columns."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        values = []
+        for column, value in zip(columns, raw):
+            python_type = column.type.python_type
+            if python_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            else:
+                values.append(python_type(value))
+        return values
+    except (ValueError, TypeError, binascii.Error, json.JSONDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset(stmt: Select, page: PageParams, *columns: Any) -> Select:
+    """Restrict `stmt` to the rows after `page.cursor`, ordered by `columns`.
+
+    One extra row is fetched so `make_page` can tell whether another page exists.
+    """
+    if page.cursor is not None:
+        values = decode_cursor(page.cursor, columns)
+        stmt = stmt.where(tuple_(*columns) > tuple_(*values))
+    return stmt.order_by(*columns).limit(page.limit + 1)
+
+
+def reject_paging(page: PageParams):
+    """For responses that stream every row: refuse `limit`/`cursor` rather than ignore them."""
+    if page.requested:
+        raise HTTPException(
+            status_code=400, detail="limit and cursor are not supported with format=ndjson"
+        )
+
+
+def make_page(
+    rows: Sequence[Any],
+    page: PageParams,
+    key: Callable[[Any], tuple],
+    build: Callable[[Any], Any] = lambda row: row,
+) -> Page:
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        next_cursor = encode_cursor(*key(rows[-1]))
+    return Page(items=[build(row) for row in rows], next_cursor=next_cursor)
@@ -0,0 +1,42 @@
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Response
+from sqlalchemy import select
+
+from app.core.db import read_db_dep
+from app.core.qr import MEDIA_TYPES, qr_renderer
+from app.core.static import IMMUTABLE_CACHE_CONTROL
+from app.model.model import BusinessOffer
+
+router = APIRouter(prefix="/qrcodes", tags=["QR Codes"])
+
+
+def redemption_url(code: str) -> str:
+    return f"http://localhost:8000/redeem/{code}"
+
+
+def qr_code_path(code: str, format: str = "png") -> str:
+    return f"/api/v1/qrcodes/{code}.{format}"
+
+
+@router.get("/{code}.{format}")
+async def get_qr_code(code: str, format: Literal["png", "svg"], db: read_db_dep):
+    """
+    Render the QR code of an offer's redemption code, or serve it from cache.
+    """
+    image = qr_renderer.cache.get((redemption_url(code), format))
+    if image is None:
+        result = await db.execute(
+            select(BusinessOffer.id).filter_by(redemption_code=code)
+        )
+        if result.first() is None:
+            raise HTTPException(status_code=404, detail="Offer not found")
+        image = await qr_renderer.render(redemption_url(code), format)
+    return Response(
+        content=image,
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+            "ETag": f'"{code}-{format}"',
+        },
+    )
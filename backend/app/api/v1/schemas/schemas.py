@@ -1,8 +1,15 @@
 # --- SCHEMAS ---
-from typing import Optional
+from typing import Generic, Optional, TypeVar
 from uuid import UUID
 from datetime import datetime
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: Optional[str] = None
 
 
 class CategoryCreate(BaseModel):
@@ -27,6 +34,8 @@ class BusinessCreate(BaseModel):
     close_hour: Optional[str] = None
     opening_days: Optional[str] = None
     photos: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     class Config:
         from_attributes=True
 
@@ -63,10 +72,13 @@ class BusinessRead(BaseModel):
     hot_line: Optional[str] = None
     targeted_gender: Optional[str] = None
     cover_photo: Optional[str] = None
+    cover_photo_variants: Optional[dict[str, str]] = None
     start_hour: Optional[str] = None
     close_hour: Optional[str] = None
     opening_days: Optional[str] = None
     photos: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     class Config:
         from_attributes = True
 
@@ -88,6 +100,7 @@ class UserRead(BaseModel):
     phone_number: Optional[str] = None
     address: Optional[str] = None
     profile_photo: Optional[str] = None
+    profile_photo_variants: Optional[dict[str, str]] = None
     categories: list[CategoryRead]
     business: Optional[BusinessRead] = None
     customer: Optional[CustomerRead] = None
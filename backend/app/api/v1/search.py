@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Query
+from sqlalchemy import Float, func, literal_column, or_, select
+
+from app.core.db import read_db_dep
+from app.model.model import Business, BusinessOffer
+
+from .business import BusinessRead, _business_options, _to_business_read
+from .dependencies import auth_dep
+from .offer import OfferRead
+from .pagination import keyset, make_page, page_dep
+from .schemas.schemas import Page
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+# Must match the configuration of the generated search_vector columns.
+TS_CONFIG = literal_column("'simple'::regconfig")
+
+
+def _ranked(model, name_column, q: str):
+    # Full-text matches use the GIN tsvector index; `%` (pg_trgm similarity)
+    # catches typos through the trigram index on the name column.
+    query = func.websearch_to_tsquery(TS_CONFIG, q)
+    score = func.ts_rank(model.search_vector, query, type_=Float) + func.similarity(
+        name_column, q, type_=Float
+    )
+    matches = or_(model.search_vector.op("@@")(query), name_column.op("%")(q))
+    return score, matches
+
+
+@router.get("/businesses", response_model=Page[BusinessRead])
+async def search_businesses(
+    db: read_db_dep, page: page_dep, q: str = Query(..., min_length=1)
+):
+    score, matches = _ranked(Business, Business.branch_name, q)
+    stmt = (
+        select(Business, score.label("score"))
+        .options(_business_options())
+        .where(matches)
+    )
+    result = await db.execute(keyset(stmt, page, -score, Business.id))
+    rows = result.unique().all()
+    return make_page(
+        rows,
+        page,
+        lambda row: (-row.score, row.Business.id),
+        lambda row: _to_business_read(row.Business),
+    )
+
+
+@router.get("/offers", response_model=Page[OfferRead], dependencies=[auth_dep])
+async def search_offers(db: read_db_dep, page: page_dep, q: str = Query(..., min_length=1)):
+    score, matches = _ranked(BusinessOffer, BusinessOffer.name, q)
+    stmt = select(BusinessOffer, score.label("score")).where(matches)
+    result = await db.execute(keyset(stmt, page, -score, BusinessOffer.id))
+    rows = result.all()
+    return make_page(
+        rows,
+        page,
+        lambda row: (-row.score, row.BusinessOffer.id),
+        lambda row: OfferRead.model_validate(row.BusinessOffer),
+    )
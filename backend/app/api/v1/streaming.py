@@ -0,0 +1,29 @@
+from typing import Any, Callable
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Select
+
+from app.core.db import async_session
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500
+
+
+def ndjson_response(stmt: Select, build: Callable[[Any], BaseModel]) -> StreamingResponse:
+    """Stream every row of `stmt` as one JSON document per line.
+
+    Rows are fetched from a server-side cursor `STREAM_BATCH_SIZE` at a time, so
+    memory stays flat regardless of table size. The session is opened inside the
+    generator because request-scoped sessions are closed before the body is sent.
+    """
+
+    async def lines():
+        async with async_session() as session:
+            result = await session.stream(
+                stmt.execution_options(yield_per=STREAM_BATCH_SIZE)
+            )
+            async for partition in result.scalars().partitions():
+                yield "".join(build(row).model_dump_json() + "\n" for row in partition)
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
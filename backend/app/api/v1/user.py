@@ -2,12 +2,19 @@ import uuid
 from fastapi import APIRouter, HTTPException, status, Query, Form
 from sqlalchemy import select
 
-from app.model.model import Business, Customer, User, Category
-from app.core.db import db_dep
+from app.model.model import Business, Customer, User
+from app.core.config import settings
+from app.core.db import db_dep, read_db_dep
+from app.core.logger import logger
+from app.core.read_cache import read_cache
 from .category import CategoryRead
+from .category_service import set_user_categories
 from .dependencies import auth_dep, current_user_dep
-from .schemas.schemas import BusinessRead, CustomerRead, UserCreate, UserRead, UserUpdate
+from .pagination import keyset, make_page, page_dep
+from .schemas.schemas import BusinessRead, CustomerRead, Page, UserCreate, UserRead, UserUpdate
 from ...core.security import get_password_hash
+from ...core.images import image_processor
+from ...core.uploads import store_upload
 from fastapi import UploadFile, File
 from uuid import UUID
 from pathlib import Path
@@ -15,50 +22,89 @@ from pathlib import Path
 router = APIRouter(prefix="/users", tags=["Users"], dependencies=[auth_dep])
 
 
-@router.get("", response_model=list[UserRead])
-async def list_users(db: db_dep):
-    result = await db.execute(select(User))
-    users = result.scalars().all()
-    return [
-        UserRead(
+@router.get("", response_model=Page[UserRead])
+async def list_users(db: read_db_dep, page: page_dep):
+    result = await db.execute(keyset(select(User), page, User.created_at, User.id))
+    users = result.unique().scalars().all()
+    return make_page(
+        users,
+        page,
+        lambda user: (user.created_at, user.id),
+        lambda user: UserRead(
             id=user.id,
             email=user.email,
             username=user.username,
             phone_number=user.phone_number,
             address=user.address,
-            age=user.age,
-            marital_status=user.marital_status,
-            price_range=user.price_range,
-            gender=user.gender,
             profile_photo=user.profile_photo,
+            profile_photo_variants=user.profile_photo_variants,
             categories=[
                 CategoryRead(id=c.id, name=c.name, key=c.key) for c in user.categories
             ],
+        ),
+    )
+
+
+def _to_user_read(db_user: User) -> UserRead:
+    business_data = None
+    if db_user.business:
+        business_data = BusinessRead(
+            branch_name=db_user.business.branch_name,
+            hot_line=db_user.business.hot_line,
+            targeted_gender=db_user.business.targeted_gender,
+            cover_photo=db_user.business.cover_photo,
+            cover_photo_variants=db_user.business.cover_photo_variants,
+            latitude=db_user.business.latitude,
+            longitude=db_user.business.longitude,
+            start_hour=db_user.business.start_hour,
+            close_hour=db_user.business.close_hour,
+            opening_days=db_user.business.opening_days,
+            photos=db_user.business.photos
         )
-        for user in users
-    ]
 
+    customer_data = None
+    if db_user.customer:
+        customer_data = CustomerRead(
+            age=db_user.customer.age,
+            marital_status=db_user.customer.marital_status,
+            price_range=db_user.customer.price_range,
+            gender=db_user.customer.gender
+        )
 
-@router.get("/{user_id}", response_model=UserRead)
-async def get_user(user_id: UUID, db: db_dep):
-    result = await db.execute(select(User).filter(User.id == user_id))
-    user = result.scalars().first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
     return UserRead(
-        id=user.id,
-        email=user.email,
-        username=user.username,
-        phone_number=user.phone_number,
-        address=user.address,
-        age=user.age,
-        marital_status=user.marital_status,
-        price_range=user.price_range,
-        gender=user.gender,
-        profile_photo=user.profile_photo,
+        id=db_user.id,
+        email=db_user.email,
+        username=db_user.username,
+        phone_number=db_user.phone_number,
+        address=db_user.address,
+        profile_photo=db_user.profile_photo,
+        profile_photo_variants=db_user.profile_photo_variants,
         categories=[
-            CategoryRead(id=c.id, name=c.name, key=c.key) for c in user.categories
+            CategoryRead(id=c.id, name=c.name, key=c.key)
+            for c in db_user.categories
         ],
+        business=business_data,
+        customer=customer_data
+    )
+
+
+async def _invalidate_user(db_user: User):
+    await read_cache.invalidate("users", db_user.id)
+    if db_user.business:
+        await read_cache.invalidate("businesses", db_user.business.id)
+
+
+@router.get("/{user_id}", response_model=UserRead)
+async def get_user(user_id: UUID, db: read_db_dep):
+    async def load():
+        result = await db.execute(select(User).filter(User.id == user_id))
+        user = result.unique().scalars().first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return _to_user_read(user)
+
+    return await read_cache.fetch(
+        "users", user_id, UserRead, load, ttl=settings.CACHE_USER_TTL
     )
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -69,6 +115,7 @@ async def delete_user(user_id: UUID, db: db_dep):
         raise HTTPException(status_code=404, detail="User not found")
     await db.delete(user)
     await db.commit()
+    await _invalidate_user(user)
     return {"deleted": "success"}
 
 
@@ -92,36 +139,38 @@ async def upload_photo(
     if not user_obj:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Create upload directory
-    upload_dir = Path("uploads") / str(user["id"])
-    upload_dir.mkdir(parents=True, exist_ok=True)
-
-    # Generate unique filename
-    file_ext = file.filename.split(".")[-1]
-    unique_filename = f"{photo_type}_{uuid.uuid4().hex}.{file_ext}"
-    file_path = upload_dir / unique_filename
-
-    # Save file
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
+    # Save file in the content-addressed store
+    relative_path, size, checksum = await store_upload(file)
 
     # Update user's photo field
-    relative_path = f"/uploads/{user['id']}/{unique_filename}"
     
     if photo_type == "avatar":
         user_obj.profile_photo = relative_path
+        user_obj.profile_photo_variants = None
     elif photo_type == "photo":
         pass
     else:
         user_obj.business.cover_photo = relative_path
+        user_obj.business.cover_photo_variants = None
 
     await db.commit()
     await db.refresh(user_obj)
+    await _invalidate_user(user_obj)
+
+    # Render derivatives only once the row points at the new photo
+    if photo_type == "avatar":
+        image_processor.schedule(relative_path, User.profile_photo)
+    elif photo_type == "cover":
+        image_processor.schedule(relative_path, Business.cover_photo)
+    else:
+        image_processor.schedule(relative_path)
 
     return {
         "message": f"{photo_type.capitalize()} photo updated successfully",
         "file_path": relative_path,
-        "type": photo_type
+        "type": photo_type,
+        "size": size,
+        "sha256": checksum
     }
 
 @router.put("/{user_id}", response_model=UserRead)
@@ -136,16 +185,6 @@ async def update_user(
         if not db_user:
             raise HTTPException(status_code=404, detail="User not found")
 
-        # Handle category updates
-        categories = []
-        if updated_data.categories:
-            for cat_id in updated_data.categories:
-                result = await db.execute(select(Category).filter(Category.id == cat_id))
-                category = result.scalars().first()
-                if not category:
-                    raise HTTPException(status_code=404, detail=f"Category {cat_id} not found")
-                categories.append(category)
-
         # Update base user fields
         for field in updated_data.model_fields_set - {"categories", "password", "business", "customer", "profile_photo"}:
             setattr(db_user, field, getattr(updated_data, field))
@@ -164,51 +203,16 @@ async def update_user(
             else:
                 db_user.customer = Customer(**updated_data.customer.model_dump())
 
-        db_user.categories = categories
+        await set_user_categories(db, db_user.id, updated_data.categories or [])
 
         await db.commit()
         await db.refresh(db_user)
+        await _invalidate_user(db_user)
 
-        # Manual mapping of nested objects
-        business_data = None
-        if db_user.business:
-            business_data = BusinessRead(
-                branch_name=db_user.business.branch_name,
-                hot_line=db_user.business.hot_line,
-                targeted_gender=db_user.business.targeted_gender,
-                cover_photo=db_user.business.cover_photo,
-                start_hour=db_user.business.start_hour,
-                close_hour=db_user.business.close_hour,
-                opening_days=db_user.business.opening_days,
-                photos=db_user.business.photos
-            )
-
-        customer_data = None
-        if db_user.customer:
-            customer_data = CustomerRead(
-                age=db_user.customer.age,
-                marital_status=db_user.customer.marital_status,
-                price_range=db_user.customer.price_range,
-                gender=db_user.customer.gender
-            )
-
-        return UserRead(
-            id=db_user.id,
-            email=db_user.email,
-            username=db_user.username,
-            phone_number=db_user.phone_number,
-            address=db_user.address,
-            profile_photo=db_user.profile_photo,
-            categories=[
-                CategoryRead(id=c.id, name=c.name, key=c.key)
-                for c in db_user.categories
-            ],
-            business=business_data,
-            customer=customer_data
-        )
+        return _to_user_read(db_user)
 
     except Exception as e:
-        print("Update Error:", e)
+        logger.error(f"User update failed: {e}")
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
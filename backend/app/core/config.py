@@ -34,7 +34,35 @@ class PostgresSettings(DatabaseSettings):
     )
     POSTGRES_URI: str = f"{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
     POSTGRES_URL: str | None = config("POSTGRES_URL", default=None)
-    DATABASE_LOGGING: bool = config("DATABASE_LOGGING", default=True)
+    # Echo every statement; prefer LOG_SLOW_SQL_MS outside of local debugging.
+    DATABASE_LOGGING: bool = config("DATABASE_LOGGING", cast=bool, default=False)
+    # Per process: each uvicorn worker holds up to POOL_SIZE + MAX_OVERFLOW connections.
+    POSTGRES_POOL_SIZE: int = config("POSTGRES_POOL_SIZE", cast=int, default=5)
+    POSTGRES_MAX_OVERFLOW: int = config("POSTGRES_MAX_OVERFLOW", cast=int, default=10)
+    POSTGRES_POOL_TIMEOUT: float = config("POSTGRES_POOL_TIMEOUT", cast=float, default=30.0)
+    POSTGRES_POOL_RECYCLE: int = config("POSTGRES_POOL_RECYCLE", cast=int, default=1800)
+    POSTGRES_POOL_PRE_PING: bool = config("POSTGRES_POOL_PRE_PING", cast=bool, default=True)
+    POSTGRES_CONNECT_TIMEOUT: float = config("POSTGRES_CONNECT_TIMEOUT", cast=float, default=10.0)
+    POSTGRES_COMMAND_TIMEOUT: float | None = config(
+        "POSTGRES_COMMAND_TIMEOUT", cast=float, default=None
+    )
+    POSTGRES_STATEMENT_CACHE_SIZE: int = config(
+        "POSTGRES_STATEMENT_CACHE_SIZE", cast=int, default=100
+    )
+    # Transaction-pooling PgBouncer cannot keep server-side prepared statements.
+    POSTGRES_PGBOUNCER: bool = config("POSTGRES_PGBOUNCER", cast=bool, default=False)
+    # Comma-separated async URLs of read replicas; empty sends all reads to the primary.
+    POSTGRES_REPLICA_URLS: str = config("POSTGRES_REPLICA_URLS", default="")
+    POSTGRES_REPLICA_MAX_LAG: float = config("POSTGRES_REPLICA_MAX_LAG", cast=float, default=5.0)
+    POSTGRES_REPLICA_CHECK_INTERVAL: float = config(
+        "POSTGRES_REPLICA_CHECK_INTERVAL", cast=float, default=5.0
+    )
+    # How long a client's reads stay on the primary after it wrote something.
+    READ_YOUR_WRITES_SECONDS: float = config("READ_YOUR_WRITES_SECONDS", cast=float, default=10.0)
+
+    @property
+    def replica_urls(self):
+        return [url.strip() for url in self.POSTGRES_REPLICA_URLS.split(",") if url.strip()]
 
 
 class EnvironmentOption(Enum):
@@ -58,6 +86,12 @@ class LogLevelOption(Enum):
 
 class LoggingSettings(BaseSettings):
     LOGLEVEL: LogLevelOption = config("LOGLEVEL", default=LogLevelOption.DEBUG)
+    LOG_FORMAT: str = config("LOG_FORMAT", default="color")  # color | json
+    LOG_QUEUE_SIZE: int = config("LOG_QUEUE_SIZE", cast=int, default=10000)
+    # e.g. "sqlalchemy.engine=0.01,app.core.logger=0.5"; WARNING and above are always kept.
+    LOG_SAMPLE_RATES: str = config("LOG_SAMPLE_RATES", default="")
+    # Log statements slower than this many milliseconds; 0 turns it off.
+    LOG_SLOW_SQL_MS: float = config("LOG_SLOW_SQL_MS", cast=float, default=0.0)
 
 
 class CORSSettings(BaseSettings):
@@ -86,6 +120,76 @@ class AuthSettings(BaseSettings):
     SECRET_KEY: str = config("SECRET_KEY")
     ALGORITHM: str = config("ALGORITHM", default="HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = config("ACCESS_TOKEN_EXPIRE_MINUTES", default=30)
+    TOKEN_CACHE_SIZE: int = config("TOKEN_CACHE_SIZE", cast=int, default=10000)
+    TOKEN_CACHE_TTL: int = config("TOKEN_CACHE_TTL", cast=int, default=300)
+    PASSWORD_HASH_WORKERS: int = config("PASSWORD_HASH_WORKERS", cast=int, default=4)
+    PASSWORD_HASH_USE_PROCESSES: bool = config(
+        "PASSWORD_HASH_USE_PROCESSES", cast=bool, default=False
+    )
+    PASSWORD_HASH_MAX_PENDING: int = config(
+        "PASSWORD_HASH_MAX_PENDING", cast=int, default=64
+    )
+
+
+class MailSettings(BaseSettings):
+    SMTP_SERVER: str = config("SMTP_SERVER", default="smtp.gmail.com")
+    SMTP_PORT: int = config("SMTP_PORT", cast=int, default=587)
+    SMTP_STARTTLS: bool = config("SMTP_STARTTLS", cast=bool, default=True)
+    SMTP_SENDER_EMAIL: str | None = config("SMTP_SENDER_EMAIL", default=None)
+    SMTP_SENDER_PASSWORD: str | None = config("SMTP_SENDER_PASSWORD", default=None)
+    SMTP_POOL_SIZE: int = config("SMTP_POOL_SIZE", cast=int, default=2)
+    SMTP_IDLE_TIMEOUT: float = config("SMTP_IDLE_TIMEOUT", cast=float, default=60.0)
+    SMTP_TIMEOUT: float = config("SMTP_TIMEOUT", cast=float, default=30.0)
+    MAIL_WORKERS: int = config("MAIL_WORKERS", cast=int, default=2)
+    MAIL_BATCH_SIZE: int = config("MAIL_BATCH_SIZE", cast=int, default=50)
+    MAIL_QUEUE_SIZE: int = config("MAIL_QUEUE_SIZE", cast=int, default=1000)
+    MAIL_MAX_ATTEMPTS: int = config("MAIL_MAX_ATTEMPTS", cast=int, default=5)
+    MAIL_RETRY_BACKOFF: float = config("MAIL_RETRY_BACKOFF", cast=float, default=2.0)
+    MAIL_SWEEP_INTERVAL: float = config("MAIL_SWEEP_INTERVAL", cast=float, default=5.0)
+    # A `sending` row whose claim is older than this is assumed abandoned and retried.
+    MAIL_CLAIM_TIMEOUT: float = config("MAIL_CLAIM_TIMEOUT", cast=float, default=600.0)
+
+    @property
+    def mail_enabled(self):
+        # Local stand-ins (aiosmtpd, MailHog) accept mail without a login.
+        return bool(self.SMTP_SENDER_EMAIL)
+
+
+class UploadSettings(BaseSettings):
+    MAX_UPLOAD_SIZE: int = config("MAX_UPLOAD_SIZE", cast=int, default=10 * 1024 * 1024)
+    # Cap on any request body, checked before it is parsed; leaves room for the
+    # multipart framing and form fields around a MAX_UPLOAD_SIZE file.
+    MAX_REQUEST_SIZE: int = config(
+        "MAX_REQUEST_SIZE", cast=int, default=10 * 1024 * 1024 + 64 * 1024
+    )
+    UPLOAD_CHUNK_SIZE: int = config("UPLOAD_CHUNK_SIZE", cast=int, default=1024 * 1024)
+    IMAGE_WORKERS: int = config("IMAGE_WORKERS", cast=int, default=2)
+    QR_WORKERS: int = config("QR_WORKERS", cast=int, default=1)
+    QR_CACHE_SIZE: int = config("QR_CACHE_SIZE", cast=int, default=1024)
+    BLOB_GC_INTERVAL: float = config("BLOB_GC_INTERVAL", cast=float, default=3600.0)
+    STATIC_MAX_AGE: int = config("STATIC_MAX_AGE", cast=int, default=3600)
+    BLOB_GC_GRACE: float = config("BLOB_GC_GRACE", cast=float, default=86400.0)
+
+
+class FeedSettings(BaseSettings):
+    FEED_PRUNE_INTERVAL: float = config("FEED_PRUNE_INTERVAL", cast=float, default=3600.0)
+
+
+class CacheSettings(BaseSettings):
+    CACHE_BACKEND: str = config("CACHE_BACKEND", default="memory")  # memory | redis
+    CACHE_MAX_ENTRIES: int = config("CACHE_MAX_ENTRIES", cast=int, default=10000)
+    CACHE_REDIS_URL: str = config("CACHE_REDIS_URL", default="redis://localhost:6379/0")
+    CACHE_REDIS_POOL_SIZE: int = config("CACHE_REDIS_POOL_SIZE", cast=int, default=4)
+    CACHE_CATEGORY_TTL: float = config("CACHE_CATEGORY_TTL", cast=float, default=3600.0)
+    CACHE_BUSINESS_TTL: float = config("CACHE_BUSINESS_TTL", cast=float, default=300.0)
+    CACHE_USER_TTL: float = config("CACHE_USER_TTL", cast=float, default=60.0)
+
+
+class MetricsSettings(BaseSettings):
+    # /metrics is only mounted when enabled; with a token, scrapers must send
+    # `Authorization: Bearer <token>`.
+    METRICS_ENABLED: bool = config("METRICS_ENABLED", cast=bool, default=False)
+    METRICS_TOKEN: str | None = config("METRICS_TOKEN", default=None)
 
 
 class Settings(
@@ -95,6 +199,11 @@ class Settings(
     LoggingSettings,
     CORSSettings,
     AuthSettings,
+    MailSettings,
+    UploadSettings,
+    FeedSettings,
+    CacheSettings,
+    MetricsSettings,
 ):
     pass
 
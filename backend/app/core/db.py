@@ -1,14 +1,23 @@
-from typing import Annotated
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from typing import Annotated, Any
 
 from alembic import command
 from alembic.config import Config
-from fastapi import Depends
+from fastapi import Depends, Request
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncAttrs, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from .config import alembic_cfg_path, settings
 from .logger import logger
+from .read_cache import read_cache
 
 
 class Base(DeclarativeBase, AsyncAttrs):
@@ -20,9 +29,102 @@ DATABASE_URI = settings.POSTGRES_URI
 DATABASE_PREFIX = settings.POSTGRES_ASYNC_PREFIX
 DATABASE_URL = f"{DATABASE_PREFIX}{DATABASE_URI}"
 
-async_engine = create_async_engine(
-    DATABASE_URL, echo=settings.DATABASE_LOGGING, future=True
-)
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection.
+
+    The wait includes opening a new connection when the pool grows into its
+    overflow, and checkouts that give up after `pool_timeout`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def metrics(self) -> dict:
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "checked_out": self.checkedout(),
+                "idle": self.checkedin(),
+                "overflow": max(self.overflow(), 0),
+                "max_overflow": self._max_overflow,
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_seconds_total": self.wait_seconds,
+                "checkout_wait_seconds_max": self.max_wait_seconds,
+            }
+
+
+def connect_args() -> dict[str, Any]:
+    """asyncpg connection arguments derived from `PostgresSettings`."""
+    args: dict[str, Any] = {
+        "timeout": settings.POSTGRES_CONNECT_TIMEOUT,
+        "command_timeout": settings.POSTGRES_COMMAND_TIMEOUT,
+        "prepared_statement_cache_size": settings.POSTGRES_STATEMENT_CACHE_SIZE,
+    }
+    if settings.POSTGRES_PGBOUNCER:
+        # No named statements survive across PgBouncer transactions, so turn
+        # both statement caches off and never reuse a statement name.
+        args["statement_cache_size"] = 0
+        args["prepared_statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    return args
+
+
+slow_query_logger = logging.getLogger("sqlalchemy.engine.slow_query")
+
+
+def _log_slow_queries(engine, threshold_ms: float):
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        if elapsed_ms >= threshold_ms:
+            slow_query_logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {statement}")
+
+
+def create_engine(url: str, **kwargs: Any):
+    engine = create_async_engine(
+        url,
+        future=True,
+        poolclass=InstrumentedPool,
+        pool_size=settings.POSTGRES_POOL_SIZE,
+        max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+        pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
+        pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+        pool_pre_ping=settings.POSTGRES_POOL_PRE_PING,
+        connect_args=connect_args(),
+        **kwargs,
+    )
+    if settings.LOG_SLOW_SQL_MS > 0:
+        _log_slow_queries(engine, settings.LOG_SLOW_SQL_MS)
+    return engine
+
+
+async_engine = create_engine(DATABASE_URL)
 
 async_session = async_sessionmaker(
     bind=async_engine, class_=AsyncSession, expire_on_commit=False
@@ -36,7 +138,9 @@ def run_upgrade(connection, cfg):
 
 
 async def run_async_migrations():
-    async_mig_engine = create_async_engine(DATABASE_URL, echo=False)
+    async_mig_engine = create_async_engine(
+        DATABASE_URL, echo=False, poolclass=NullPool, connect_args=connect_args()
+    )
     async with async_mig_engine.begin() as conn:
         await conn.run_sync(run_upgrade, Config(alembic_cfg_path))
 
@@ -50,3 +154,135 @@ async def async_get_db() -> AsyncSession:
 
 
 db_dep = Annotated[AsyncSession, Depends(async_get_db)]
+
+# Subjects that wrote recently, pinned to the primary until the entry expires.
+PRIMARY_PINS = "primary_pins"
+
+# Seconds the replica is behind; 0 when it has replayed everything it received,
+# so an idle primary does not look like lag. NULL when the WAL receiver is not
+# streaming: a disconnected replica has also replayed all it received, but
+# that says nothing about how far the primary has moved on since.
+_REPLICA_LAG = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver
+            WHERE COALESCE(status, 'streaming') = 'streaming'
+        ) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaRouter:
+    """Spreads read-only sessions over replicas that are within `max_lag`.
+
+    Replication lag is polled in the background; a replica that is too far
+    behind or unreachable is skipped until it recovers, and with no usable
+    replica reads go to the primary.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        max_lag: float = settings.POSTGRES_REPLICA_MAX_LAG,
+        interval: float = settings.POSTGRES_REPLICA_CHECK_INTERVAL,
+    ):
+        self.max_lag = max_lag
+        self.interval = interval
+        self.engines = [create_engine(url) for url in urls]
+        self.sessions = [
+            async_sessionmaker(
+                bind=engine.execution_options(postgresql_readonly=True),
+                class_=AsyncSession,
+                expire_on_commit=False,
+            )
+            for engine in self.engines
+        ]
+        # None until the first successful check, and while unreachable
+        self.lag: list[float | None] = [None] * len(self.engines)
+        self._next = 0
+        self._task: asyncio.Task | None = None
+
+    def sessionmaker(self) -> async_sessionmaker | None:
+        usable = [i for i, lag in enumerate(self.lag) if lag is not None and lag <= self.max_lag]
+        if not usable:
+            return None
+        self._next = (self._next + 1) % len(usable)
+        return self.sessions[usable[self._next]]
+
+    async def check(self):
+        for i, engine in enumerate(self.engines):
+            try:
+                async with engine.connect() as conn:
+                    lag = (await conn.execute(_REPLICA_LAG)).scalar_one()
+            except Exception as e:
+                if self.lag[i] is not None:
+                    logger.warning(f"Read replica {i} unreachable: {e}")
+                lag = None
+            else:
+                if lag is None:
+                    if self.lag[i] is not None:
+                        logger.warning(f"Read replica {i} is not streaming from the primary")
+                    self.lag[i] = None
+                    continue
+                lag = float(lag)
+                if lag > self.max_lag and (self.lag[i] or 0) <= self.max_lag:
+                    logger.warning(f"Read replica {i} is {lag:.1f}s behind, skipping it")
+            self.lag[i] = lag
+
+    async def start(self):
+        if self.engines:
+            await self.check()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for engine in self.engines:
+            await engine.dispose()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    def metrics(self) -> dict:
+        return {"replicas": len(self.engines), "lag_seconds": list(self.lag)}
+
+
+replica_router = ReplicaRouter(settings.replica_urls)
+
+
+async def pin_to_primary(subject: str, seconds: float):
+    await read_cache.backend.set(PRIMARY_PINS, subject, b"1", seconds)
+
+
+async def _pinned_to_primary(request: Request) -> bool:
+    # Imported here: security imports the models, which import this module.
+    from .security import token_subject
+
+    subject = token_subject(request)
+    return subject is not None and await read_cache.backend.get(PRIMARY_PINS, subject) is not None
+
+
+async def async_get_read_db(request: Request) -> AsyncSession:
+    """Session for handlers that only read; may be served by a replica."""
+    sessionmaker = replica_router.sessionmaker()
+    if sessionmaker is not None and await _pinned_to_primary(request):
+        sessionmaker = None
+    async with (sessionmaker or async_session)() as db:
+        try:
+            yield db
+        finally:
+            await db.close()
+
+
+read_db_dep = Annotated[AsyncSession, Depends(async_get_read_db)]
+
+
+def pool_metrics() -> dict:
+    return async_engine.pool.metrics()
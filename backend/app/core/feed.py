@@ -0,0 +1,52 @@
+import asyncio
+
+from sqlalchemy import delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.model.model import OfferFeed
+
+from .config import settings
+from .db import async_session
+from .logger import logger
+
+
+async def prune_feed(db: AsyncSession) -> int:
+    """Drop feed rows whose offer has ended.
+
+    Inserts and re-scores are handled by the offer_feed triggers; expired rows
+    are only filtered at read time, so they are removed here in bulk.
+    """
+    result = await db.execute(delete(OfferFeed).where(OfferFeed.end_date < func.now()))
+    await db.commit()
+    return result.rowcount
+
+
+class FeedPruner:
+    """Periodically removes expired offers from the precomputed feed."""
+
+    def __init__(self, interval: float = settings.FEED_PRUNE_INTERVAL):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                async with async_session() as db:
+                    removed = await prune_feed(db)
+                if removed:
+                    logger.info(f"Pruned {removed} expired feed entries")
+            except Exception as e:
+                logger.error(f"Feed pruning failed: {e}")
+
+
+feed_pruner = FeedPruner()
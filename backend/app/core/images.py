@@ -0,0 +1,138 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy import update
+from sqlalchemy.orm import InstrumentedAttribute
+
+from .config import settings
+from .db import async_session
+from .logger import logger
+from .read_cache import read_cache
+from .uploads import url_to_path
+
+# Longest edge in pixels for each resized variant.
+VARIANT_SIZES = {"thumb": 160, "medium": 640}
+# Cached reads that embed each table's variant columns.
+_CACHED_READS = {"user": ("users", "businesses"), "business": ("businesses", "users")}
+
+
+def variant_url(url: str, size: str, format: str) -> str:
+    """Name of a derivative: `/uploads/x/abc.jpg` -> `/uploads/x/abc.thumb.webp`."""
+    stem, ext = os.path.splitext(url)
+    suffix = ".webp" if format == "webp" else ext
+    if size == "original":
+        return url if format == "original" else stem + suffix
+    return f"{stem}.{size}{suffix}"
+
+
+def variant_urls(url: str) -> dict[str, str]:
+    """All derivative URLs of `url`, keyed `thumb`, `thumb_webp`, ..., `webp`."""
+    urls = {}
+    for size in VARIANT_SIZES:
+        urls[size] = variant_url(url, size, "original")
+        urls[f"{size}_webp"] = variant_url(url, size, "webp")
+    urls["webp"] = variant_url(url, "original", "webp")
+    return urls
+
+
+def existing_variants(url: Optional[str]) -> Optional[dict[str, str]]:
+    """Derivatives of `url` already on disk, or None if there are none."""
+    if not url:
+        return None
+    found = {k: v for k, v in variant_urls(url).items() if url_to_path(v).exists()}
+    return found or None
+
+
+def render_variants(url: str) -> dict[str, str]:
+    """Write every derivative of the image at `url`. Runs in a worker process."""
+    with Image.open(url_to_path(url)) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGBA" if image.mode in ("P", "LA", "PA") else "RGB")
+        rendered = {}
+        for key, target in variant_urls(url).items():
+            rendered[key] = target
+            if target == url:
+                continue
+            size = key.split("_")[0]
+            copy = image.copy()
+            if size in VARIANT_SIZES:
+                edge = VARIANT_SIZES[size]
+                copy.thumbnail((edge, edge))
+            # Blobs may lack an extension, so the format never comes from the name.
+            format = "WEBP" if key.endswith("webp") else source.format
+            try:
+                copy.save(url_to_path(target), format=format, optimize=True)
+            except KeyError:
+                raise ValueError(f"Pillow cannot write {format} images")
+        return rendered
+
+
+class ImageProcessor:
+    """Renders image derivatives in a process pool after an upload completes.
+
+    Once rendered, the variant URLs are stored in the `<column>_variants`
+    column of every row whose `column` points at the uploaded image; with no
+    column the derivatives are only written to disk.
+    """
+
+    def __init__(self, workers: int = settings.IMAGE_WORKERS):
+        self.workers = workers
+        self._executor: Executor | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def schedule(self, url: str, column: Optional[InstrumentedAttribute] = None):
+        task = asyncio.create_task(self._process(url, column))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, url: str, column: Optional[InstrumentedAttribute]):
+        loop = asyncio.get_running_loop()
+        try:
+            # Content-addressed uploads may already have been rendered.
+            variants = await loop.run_in_executor(None, existing_variants, url)
+            if variants is None or len(variants) < len(variant_urls(url)):
+                variants = await loop.run_in_executor(
+                    self.executor, render_variants, url
+                )
+        except (UnidentifiedImageError, OSError, ValueError) as e:
+            logger.warning(f"Could not render variants of {url}: {e}")
+            return
+        except Exception as e:
+            # Anything else (a crashed worker, a Pillow bug) would otherwise
+            # vanish with the background task.
+            logger.error(f"Rendering variants of {url} failed: {e!r}")
+            return
+        if column is None:
+            return
+        try:
+            async with async_session() as db:
+                await db.execute(
+                    update(column.class_)
+                    .where(column == url)
+                    .values({f"{column.key}_variants": variants})
+                )
+                await db.commit()
+            for namespace in _CACHED_READS.get(column.class_.__tablename__, ()):
+                await read_cache.invalidate(namespace)
+        except Exception as e:
+            logger.error(f"Could not record variants of {url}: {e}")
+
+    def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+image_processor = ImageProcessor()
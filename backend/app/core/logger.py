@@ -1,4 +1,11 @@
+import atexit
+import json
 import logging
+import queue
+import random
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 
 import colorlog
 
@@ -6,29 +13,118 @@ from app.core.config import settings
 
 # Logging settings
 LOGGING_LEVEL = int(settings.LOGLEVEL.value)
-# Create a custom logger
-logger = logging.getLogger(__name__)
-logger.setLevel(LOGGING_LEVEL)
 
-# Console handler with colored output
+# Set per request by RequestIdMiddleware; "-" outside of a request.
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps records with the current request ID.
+
+    Runs in the emitting thread, before the record is queued, since the
+    listener thread cannot see the request's context.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps only a fraction of the records below WARNING per logger prefix.
+
+    `rates` maps a logger name prefix to the share of records kept, e.g.
+    `{"sqlalchemy.engine": 0.01}`; the longest matching prefix wins.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                return rate >= 1 or random.random() < rate
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: records are dropped while the queue is full."""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _parse_sample_rates(value: str) -> dict[str, float]:
+    rates = {}
+    for item in value.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def _console_formatter() -> logging.Formatter:
+    if settings.LOG_FORMAT == "json":
+        return JsonFormatter()
+    # Formatter for colored output in console
+    return colorlog.ColoredFormatter(
+        "%(log_color)s%(asctime)s | %(levelname)s | %(request_id)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        log_colors={
+            "DEBUG": "cyan",
+            "INFO": "green",
+            "WARNING": "yellow",
+            "ERROR": "red",
+            "CRITICAL": "bold_red",
+        },
+    )
+
+
+# Console output happens on the listener thread; callers only enqueue.
 console_handler = logging.StreamHandler()
 console_handler.setLevel(LOGGING_LEVEL)
+console_handler.setFormatter(_console_formatter())
+
+queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+queue_handler.addFilter(RequestContextFilter())
+queue_handler.addFilter(SamplingFilter(_parse_sample_rates(settings.LOG_SAMPLE_RATES)))
+
+listener = QueueListener(queue_handler.queue, console_handler, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop)
+
+# Create a custom logger
+logger = logging.getLogger(__name__)
+logger.setLevel(LOGGING_LEVEL)
+logger.addHandler(queue_handler)
 
-# Formatter for colored output in console
-colored_formatter = colorlog.ColoredFormatter(
-    "%(log_color)s%(asctime)s | %(levelname)s | %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    log_colors={
-        "DEBUG": "cyan",
-        "INFO": "green",
-        "WARNING": "yellow",
-        "ERROR": "red",
-        "CRITICAL": "bold_red",
-    },
-)
-
-# Set the formatter for the console handler
-console_handler.setFormatter(colored_formatter)
-
-# Add the console handler to the logger
-logger.addHandler(console_handler)
+# SQL echo and slow-query records go through the same queue. Engines are
+# created without `echo=`, which would attach a synchronous stdout handler to
+# `sqlalchemy.engine.Engine`; statements are logged when this logger's level
+# allows INFO instead.
+sql_logger = logging.getLogger("sqlalchemy.engine")
+sql_logger.setLevel(logging.INFO if settings.DATABASE_LOGGING else logging.WARNING)
+sql_logger.addHandler(queue_handler)
+sql_logger.propagate = False
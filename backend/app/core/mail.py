@@ -0,0 +1,149 @@
+import smtplib
+import ssl
+import threading
+import time
+from email.message import Message
+from typing import Iterable, List, Optional, Tuple
+
+from .config import settings
+
+# Errors after which a pooled session is assumed stale (dropped by the server or
+# logged out) and is replaced by a freshly authenticated one.
+_RECONNECT_ERRORS = (
+    smtplib.SMTPServerDisconnected,
+    smtplib.SMTPSenderRefused,
+    ConnectionError,
+)
+
+
+class EmailConfig:
+    def __init__(self):
+        self.smtp_server = settings.SMTP_SERVER
+        self.smtp_port = settings.SMTP_PORT
+        self.use_starttls = settings.SMTP_STARTTLS
+        self.sender_email = settings.SMTP_SENDER_EMAIL
+        self.sender_password = settings.SMTP_SENDER_PASSWORD
+
+
+email_config = EmailConfig()
+
+
+def _close(server: smtplib.SMTP):
+    try:
+        server.quit()
+    except OSError:
+        server.close()
+
+
+class SMTPConnectionPool:
+    """Thread-safe pool of authenticated, keep-alive SMTP sessions.
+
+    At most `size` sessions are in use at once. Sessions idle for longer than
+    `idle_timeout` seconds are closed instead of reused, and a session that turns
+    out to be dead is reconnected and logged in again transparently.
+    """
+
+    def __init__(
+        self,
+        config: EmailConfig,
+        size: int = settings.SMTP_POOL_SIZE,
+        idle_timeout: float = settings.SMTP_IDLE_TIMEOUT,
+        timeout: float = settings.SMTP_TIMEOUT,
+    ):
+        self.config = config
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(
+            self.config.smtp_server, self.config.smtp_port, timeout=self.timeout
+        )
+        try:
+            server.ehlo()
+            if self.config.use_starttls:
+                server.starttls(context=ssl.create_default_context())
+                server.ehlo()
+            if self.config.sender_password:
+                server.login(self.config.sender_email, self.config.sender_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _acquire(self) -> Optional[smtplib.SMTP]:
+        self._slots.acquire()
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                server, last_used = self._idle.pop()
+            if now - last_used <= self.idle_timeout:
+                return server
+            _close(server)
+
+    def _release(self, server: Optional[smtplib.SMTP]):
+        if server is not None:
+            with self._lock:
+                self._idle.append((server, time.monotonic()))
+        self._slots.release()
+
+    def _sendmail(
+        self, server: Optional[smtplib.SMTP], message: str, recipients: List[str]
+    ) -> smtplib.SMTP:
+        if server is None:
+            server = self._connect()
+        try:
+            server.sendmail(self.config.sender_email, recipients, message)
+        except _RECONNECT_ERRORS:
+            _close(server)
+            server = self._connect()
+            server.sendmail(self.config.sender_email, recipients, message)
+        return server
+
+    def send_batch(
+        self, messages: Iterable[Tuple[str, List[str]]]
+    ) -> List[Optional[Exception]]:
+        """Deliver every (message, recipients) pair over a single session.
+
+        Returns one entry per message: None if it was sent, otherwise the error.
+        """
+        results: List[Optional[Exception]] = []
+        server = self._acquire()
+        try:
+            for message, recipients in messages:
+                try:
+                    server = self._sendmail(server, message, recipients)
+                    results.append(None)
+                except Exception as e:
+                    results.append(e)
+        finally:
+            self._release(server)
+        return results
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            _close(server)
+
+
+smtp_pool = SMTPConnectionPool(email_config)
+
+
+def send_email_smtp(message: str, recipients: List[str]):
+    """Send an already-rendered message over a pooled SMTP session (blocking)."""
+    (error,) = smtp_pool.send_batch([(message, recipients)])
+    if error is not None:
+        raise error
+
+
+def send_email_batch(messages: Iterable[Message]) -> List[Optional[Exception]]:
+    """Send many messages to their `To` recipients over one session (blocking)."""
+    return smtp_pool.send_batch(
+        (message.as_string(), [addr.strip() for addr in message["To"].split(",")])
+        for message in messages
+    )
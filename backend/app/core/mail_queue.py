@@ -0,0 +1,212 @@
+import asyncio
+from email.message import Message
+from typing import Callable, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from app.model.model import MailOutbox, MailStatus
+
+from .config import settings
+from .db import async_session
+from .logger import logger
+from .mail import smtp_pool
+
+SendBatch = Callable[[List[Tuple[str, List[str]]]], List[Optional[Exception]]]
+
+
+class MailQueue:
+    """In-process outbound mail queue backed by the `mail_outbox` table.
+
+    Messages are written to the outbox before they are queued, so nothing is lost
+    if the process stops. A bounded pool of workers delivers them off the event
+    loop, draining up to `batch_size` messages per SMTP session; failures are
+    retried with exponential backoff until `max_attempts`.
+    A periodic sweep re-queues due rows that are not already in memory, which
+    covers retries, restarts and enqueues that found the queue full. Workers
+    claim rows by committing a `sending` status with a lease before talking to
+    SMTP, so several processes can share one outbox without sending a message
+    twice; rows whose lease ran out (the process died mid-send) are retried.
+    """
+
+    def __init__(
+        self,
+        send_batch: SendBatch = smtp_pool.send_batch,
+        workers: int = settings.MAIL_WORKERS,
+        batch_size: int = settings.MAIL_BATCH_SIZE,
+        maxsize: int = settings.MAIL_QUEUE_SIZE,
+        max_attempts: int = settings.MAIL_MAX_ATTEMPTS,
+        backoff: float = settings.MAIL_RETRY_BACKOFF,
+        sweep_interval: float = settings.MAIL_SWEEP_INTERVAL,
+        claim_timeout: float = settings.MAIL_CLAIM_TIMEOUT,
+    ):
+        self.send_batch = send_batch
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.sweep_interval = sweep_interval
+        self.claim_timeout = claim_timeout
+        self._queue: asyncio.Queue[UUID] = asyncio.Queue(maxsize=maxsize)
+        self._queued: set[UUID] = set()
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    async def enqueue(
+        self, db: AsyncSession, message: Message, recipients: List[str]
+    ) -> UUID:
+        (outbox_id,) = await self.enqueue_many(db, [(message, recipients)])
+        return outbox_id
+
+    async def enqueue_many(
+        self, db: AsyncSession, messages: Iterable[Tuple[Message, List[str]]]
+    ) -> List[UUID]:
+        rows = [
+            MailOutbox(recipients=",".join(recipients), message=message.as_string())
+            for message, recipients in messages
+        ]
+        db.add_all(rows)
+        await db.commit()
+        for row in rows:
+            self._put(row.id)
+        return [row.id for row in rows]
+
+    async def start(self):
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._sweeper()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _put(self, outbox_id: UUID):
+        if outbox_id in self._queued:
+            return
+        try:
+            self._queue.put_nowait(outbox_id)
+        except asyncio.QueueFull:
+            # Still pending in the outbox; the sweeper picks it up later.
+            return
+        self._queued.add(outbox_id)
+
+    async def _sweeper(self):
+        while True:
+            try:
+                async with async_session() as db:
+                    result = await db.execute(
+                        select(MailOutbox.id)
+                        .where(
+                            or_(
+                                and_(
+                                    MailOutbox.status == MailStatus.PENDING.value,
+                                    MailOutbox.next_attempt_at <= func.now(),
+                                ),
+                                self._lease_expired(),
+                            )
+                        )
+                        .order_by(MailOutbox.next_attempt_at)
+                        .limit(self._queue.maxsize)
+                    )
+                    for outbox_id in result.scalars():
+                        self._put(outbox_id)
+            except Exception as e:
+                logger.error(f"Mail outbox sweep failed: {e}")
+            await asyncio.sleep(self.sweep_interval)
+
+    async def _worker(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._deliver(batch)
+            except Exception as e:
+                logger.error(f"Mail worker failed on a batch of {len(batch)}: {e}")
+            finally:
+                for outbox_id in batch:
+                    self._queued.discard(outbox_id)
+                    self._queue.task_done()
+
+    def _lease_expired(self):
+        return and_(
+            MailOutbox.status == MailStatus.SENDING.value,
+            MailOutbox.claimed_at
+            < func.now() - func.make_interval(0, 0, 0, 0, 0, 0, self.claim_timeout),
+        )
+
+    async def _claim(self, batch: List[UUID]) -> list:
+        # Committed before any mail is sent, so no row lock or connection is
+        # held for the SMTP round trips; SKIP LOCKED lets concurrent claimers
+        # split contended rows instead of waiting on each other.
+        claimable = (
+            select(MailOutbox.id)
+            .where(
+                MailOutbox.id.in_(batch),
+                or_(MailOutbox.status == MailStatus.PENDING.value, self._lease_expired()),
+            )
+            .with_for_update(skip_locked=True)
+        )
+        async with async_session() as db:
+            result = await db.execute(
+                update(MailOutbox)
+                .where(MailOutbox.id.in_(claimable.scalar_subquery()))
+                .values(status=MailStatus.SENDING.value, claimed_at=func.now())
+                .returning(
+                    MailOutbox.id,
+                    MailOutbox.message,
+                    MailOutbox.recipients,
+                    MailOutbox.attempts,
+                    MailOutbox.claimed_at,
+                )
+            )
+            rows = result.all()
+            await db.commit()
+        return rows
+
+    async def _deliver(self, batch: List[UUID]):
+        rows = await self._claim(batch)
+        if not rows:
+            return
+        errors = await asyncio.to_thread(
+            self.send_batch,
+            [(row.message, row.recipients.split(",")) for row in rows],
+        )
+        async with async_session() as db:
+            for row, error in zip(rows, errors):
+                if error is None:
+                    values = {"status": MailStatus.SENT.value, "sent_at": func.now()}
+                else:
+                    attempts = row.attempts + 1
+                    values = {"attempts": attempts, "last_error": str(error)}
+                    if attempts >= self.max_attempts:
+                        values["status"] = MailStatus.FAILED.value
+                        logger.error(f"Giving up on mail {row.id}: {error}")
+                    else:
+                        delay = self.backoff * 2 ** (attempts - 1)
+                        values["status"] = MailStatus.PENDING.value
+                        values["next_attempt_at"] = func.now() + func.make_interval(
+                            0, 0, 0, 0, 0, 0, delay
+                        )
+                        logger.warning(f"Mail {row.id} failed, retrying in {delay}s: {error}")
+                # Only if the claim is still ours, i.e. the lease was not taken over.
+                await db.execute(
+                    update(MailOutbox)
+                    .where(
+                        MailOutbox.id == row.id,
+                        MailOutbox.status == MailStatus.SENDING.value,
+                        MailOutbox.claimed_at == row.claimed_at,
+                    )
+                    .values(values)
+                )
+            await db.commit()
+
+mail_queue = MailQueue()
@@ -1,7 +1,271 @@
+import hashlib
+import hmac
+import uuid
+
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from .config import settings
-from fastapi import FastAPI
+from .db import pin_to_primary, pool_metrics, replica_router
+from .logger import queue_handler, request_id_var
+from .mail_queue import mail_queue
+from .metrics import MetricsMiddleware, registry
+from .qr import qr_renderer
+from .read_cache import read_cache
+from .security import password_hasher, token_cache, token_subject
+from fastapi import FastAPI, HTTPException
+
+
+def weak_etag(tag: str) -> str:
+    return f'W/"{tag}"'
+
+
+def if_none_match(headers: Headers) -> set[str]:
+    """ETags listed in If-None-Match, normalised to their weak form."""
+    values = set()
+    for value in headers.get("if-none-match", "").split(","):
+        value = value.strip()
+        if value:
+            values.add(value if value.startswith("W/") else f"W/{value}")
+    return values
+
+
+class ConditionalRequestMiddleware:
+    """Adds ETag/Cache-Control to GET responses and answers 304 where possible.
+
+    Routes guarded by the `conditional` dependency have already compared
+    their row-version ETag (left in `request.state`) and only need the
+    headers attached. Other JSON responses get a weak ETag from a hash of
+    the body, which saves bandwidth but not the work of producing it.
+    Streaming responses are passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        request_tags = if_none_match(Headers(scope=scope))
+        start: Message | None = None
+        body = []
+
+        async def send_wrapper(message: Message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                state = scope.get("state", {})
+                if message["status"] != 200:
+                    await send(message)
+                    return
+                headers = MutableHeaders(scope=message)
+                if "etag" in state:
+                    headers["etag"] = state["etag"]
+                    headers.setdefault("cache-control", state["cache_control"])
+                    await send(message)
+                    return
+                if headers.get("content-type") != "application/json" or "etag" in headers:
+                    await send(message)
+                    return
+                start = message  # Hold the headers until the body is hashed
+                return
+
+            if start is None:
+                await send(message)
+                return
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            content = b"".join(body)
+            etag = weak_etag(hashlib.sha1(content).hexdigest())
+            headers = MutableHeaders(scope=start)
+            headers["etag"] = etag
+            headers.setdefault("cache-control", "private, no-cache")
+            if etag in request_tags:
+                start["status"] = 304
+                del headers["content-length"]
+                del headers["content-type"]
+                content = b""
+            await send(start)
+            await send({"type": "http.response.body", "body": content})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class BodySizeLimitMiddleware:
+    """Rejects request bodies larger than `max_size` with 413.
+
+    A declared Content-Length over the limit is refused before anything is
+    read. Otherwise the body is counted as it arrives, so multipart parsing
+    stops spooling an oversized upload as soon as it passes the limit.
+    """
+
+    def __init__(self, app: ASGIApp, max_size: int = settings.MAX_REQUEST_SIZE):
+        self.app = app
+        self.max_size = max_size
+        self.detail = f"Request body exceeds the maximum size of {max_size} bytes"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        declared = Headers(scope=scope).get("content-length", "")
+        if declared.isdigit() and int(declared) > self.max_size:
+            response = JSONResponse({"detail": self.detail}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def receive_wrapper() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    # FastAPI re-raises HTTPExceptions from body parsing as-is.
+                    raise HTTPException(status_code=413, detail=self.detail)
+            return message
+
+        await self.app(scope, receive_wrapper, send)
+
+
+class ReadYourWritesMiddleware:
+    """Pins a client's reads to the primary for a while after it writes.
+
+    Successful non-GET requests pin the bearer token's subject (JWT `sub`)
+    in the cache backend, and `async_get_read_db` reads from the primary
+    while the pin lasts, so a client never reads from a replica that has not
+    yet replayed its own change. With the Redis backend the pin is seen by
+    every worker; the memory backend only pins within one process.
+    """
+
+    def __init__(self, app: ASGIApp, window: float = settings.READ_YOUR_WRITES_SECONDS):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                subject = token_subject(Request(scope))
+                if subject is not None:
+                    await pin_to_primary(subject, self.window)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class RequestIdMiddleware:
+    """Tags each request with an ID for log correlation.
+
+    A client-supplied `X-Request-ID` is kept, otherwise one is generated; it
+    is echoed on the response and stamped on every record logged while the
+    request is handled.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id") or uuid.uuid4().hex
+        token = request_id_var.set(request_id[:64])
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["x-request-id"] = request_id_var.get()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
+
+
+def _service_metrics():
+    pool = pool_metrics()
+    yield "db_pool_size", "gauge", "Configured pool size.", [({}, pool["size"])]
+    yield "db_pool_checked_out", "gauge", "Connections in use.", [({}, pool["checked_out"])]
+    yield "db_pool_idle", "gauge", "Idle pooled connections.", [({}, pool["idle"])]
+    yield "db_pool_overflow", "gauge", "Connections open beyond the pool size.", [
+        ({}, pool["overflow"])
+    ]
+    yield "db_pool_checkouts_total", "counter", "Connection checkouts.", [
+        ({}, pool["checkouts"])
+    ]
+    yield "db_pool_checkout_timeouts_total", "counter", "Checkouts that timed out.", [
+        ({}, pool["checkout_timeouts"])
+    ]
+    yield "db_pool_checkout_wait_seconds_total", "counter", "Time spent waiting for a connection.", [
+        ({}, pool["checkout_wait_seconds_total"])
+    ]
+    yield "db_replica_lag_seconds", "gauge", "Replication lag; -1 when unreachable.", [
+        ({"replica": str(i)}, -1 if lag is None else lag)
+        for i, lag in enumerate(replica_router.lag)
+    ]
+
+    yield "mail_queue_depth", "gauge", "Outbox messages waiting for a worker.", [
+        ({}, mail_queue.depth)
+    ]
+
+    hasher = password_hasher.metrics()
+    yield "password_hash_in_flight", "gauge", "Hashes being computed.", [({}, hasher["in_flight"])]
+    yield "password_hash_waiting", "gauge", "Callers waiting for a hash worker.", [
+        ({}, hasher["waiting"])
+    ]
+    yield "password_hash_rejected_total", "counter", "Hashes refused with 503.", [
+        ({}, hasher["rejected"])
+    ]
+
+    caches = [
+        ("token", token_cache.metrics()),
+        ("qr", qr_renderer.cache.metrics()),
+    ]
+    caches += [
+        (f"read_{namespace}", stats)
+        for namespace, stats in read_cache.metrics()["namespaces"].items()
+    ]
+    yield "cache_hits_total", "counter", "Cache hits.", [
+        ({"cache": name}, stats["hits"]) for name, stats in caches
+    ]
+    yield "cache_misses_total", "counter", "Cache misses.", [
+        ({"cache": name}, stats["misses"]) for name, stats in caches
+    ]
+
+    yield "log_records_dropped_total", "counter", "Log records dropped on a full queue.", [
+        ({}, queue_handler.dropped)
+    ]
+
+
+registry.add_collector(_service_metrics)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+        supplied = request.headers.get("authorization", "").encode()
+        if not hmac.compare_digest(supplied, expected):
+            return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def setup_metrics(app: FastAPI):
+    if not settings.METRICS_ENABLED:
+        return
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+    app.add_middleware(MetricsMiddleware)
 
 
 def setup_cors_middleware(app: FastAPI):
@@ -15,4 +279,10 @@ def setup_cors_middleware(app: FastAPI):
 
 
 def setup_middlewares(app: FastAPI):
+    app.add_middleware(BodySizeLimitMiddleware)
+    app.add_middleware(ConditionalRequestMiddleware)
+    if settings.replica_urls:
+        app.add_middleware(ReadYourWritesMiddleware)
+    app.add_middleware(RequestIdMiddleware)
     setup_cors_middleware(app)
+    setup_metrics(app)
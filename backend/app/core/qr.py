@@ -0,0 +1,84 @@
+import asyncio
+import io
+import math
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Literal
+
+import qrcode
+import qrcode.image.svg
+
+from .cache import LRUCache
+from .config import settings
+
+QRFormat = Literal["png", "svg"]
+MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+def render_qr(data: str, format: QRFormat) -> bytes:
+    """Render `data` as a QR code image. Runs in a worker process."""
+    if format == "svg":
+        image = qrcode.make(data, image_factory=qrcode.image.svg.SvgPathImage)
+    else:
+        image = qrcode.make(data)
+    buffer = io.BytesIO()
+    image.save(buffer)
+    return buffer.getvalue()
+
+
+class QRRenderer:
+    """Renders QR codes in a process pool, caching images by payload.
+
+    Concurrent requests for the same payload share a single render.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.QR_WORKERS,
+        cache_size: int = settings.QR_CACHE_SIZE,
+    ):
+        self.workers = workers
+        self.cache = LRUCache(maxsize=cache_size)
+        self._executor: Executor | None = None
+        self._pending: dict[tuple[str, str], asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def render(self, data: str, format: QRFormat = "png") -> bytes:
+        key = (data, format)
+        image = self.cache.get(key)
+        if image is not None:
+            return image
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, render_qr, data, format)
+        self._pending[key] = future
+        try:
+            image = await future
+        finally:
+            del self._pending[key]
+        self.cache.set(key, image, expires_at=math.inf)
+        return image
+
+    def prefetch(self, data: str, format: QRFormat = "png"):
+        """Warm the cache in the background without making the caller wait."""
+        task = asyncio.create_task(self.render(data, format))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+qr_renderer = QRRenderer()
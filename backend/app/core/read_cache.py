@@ -0,0 +1,277 @@
+import asyncio
+import math
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Optional, Protocol
+from urllib.parse import urlparse
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from .cache import LRUCache
+from .config import settings
+from .logger import logger
+
+
+class CacheBackend(Protocol):
+    """Byte store behind `ReadThroughCache`, partitioned into namespaces.
+
+    `clear(namespace)` must drop every key of the namespace at once so list
+    pages can be invalidated without knowing which cursors were cached.
+    """
+
+    async def get(self, namespace: str, key: str) -> Optional[bytes]: ...
+
+    async def set(self, namespace: str, key: str, value: bytes, ttl: float): ...
+
+    async def delete(self, namespace: str, *keys: str): ...
+
+    async def clear(self, namespace: str): ...
+
+    async def close(self): ...
+
+
+class MemoryBackend:
+    """Per-process backend on top of `LRUCache`.
+
+    Namespaces are cleared by bumping a generation number that is part of
+    every key; the orphaned entries age out of the LRU.
+    """
+
+    def __init__(self, maxsize: int):
+        self.cache = LRUCache(maxsize=maxsize)
+        self._generations: dict[str, int] = defaultdict(int)
+
+    def _key(self, namespace: str, key: str) -> tuple:
+        return (namespace, self._generations[namespace], key)
+
+    async def get(self, namespace: str, key: str) -> Optional[bytes]:
+        return self.cache.get(self._key(namespace, key))
+
+    async def set(self, namespace: str, key: str, value: bytes, ttl: float):
+        self.cache.set(self._key(namespace, key), value, expires_at=time.time() + ttl)
+
+    async def delete(self, namespace: str, *keys: str):
+        for key in keys:
+            self.cache.delete(self._key(namespace, key))
+
+    async def clear(self, namespace: str):
+        self._generations[namespace] += 1
+
+    async def close(self):
+        self.cache.clear()
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisBackend:
+    """Backend speaking the Redis protocol (RESP) over a small connection pool.
+
+    Any server implementing HGET/HSET/HDEL/DEL/PEXPIRE works. Each namespace
+    is one hash, so clearing it is a single DEL; per-entry expiry is stored
+    alongside the value. Connection failures degrade to cache misses, and the
+    server is not retried for `retry_after` seconds.
+    """
+
+    def __init__(
+        self, url: str, pool_size: int = 4, timeout: float = 1.0, retry_after: float = 5.0
+    ):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._down_until = 0.0
+        self._pool: asyncio.LifoQueue = asyncio.LifoQueue()
+        self._slots = asyncio.Semaphore(pool_size)
+
+    @staticmethod
+    def _encode(*args: Any) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    @staticmethod
+    async def _read(reader: asyncio.StreamReader) -> Any:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("connection closed by server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body
+        if kind == b"-":
+            raise RedisError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = await reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(body)
+            if count < 0:
+                return None
+            return [await RedisBackend._read(reader) for _ in range(count)]
+        raise RedisError(f"unexpected reply {line!r}")
+
+    async def _connect(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            await self._roundtrip((reader, writer), *setup)
+        return reader, writer
+
+    async def _roundtrip(self, connection, *commands: tuple) -> list:
+        reader, writer = connection
+        writer.write(b"".join(self._encode(*command) for command in commands))
+        await writer.drain()
+        return [await self._read(reader) for _ in commands]
+
+    async def _execute(self, *commands: tuple) -> Optional[list]:
+        if time.monotonic() < self._down_until:
+            return None
+        async with self._slots:
+            connection = None if self._pool.empty() else self._pool.get_nowait()
+            try:
+                if connection is None:
+                    connection = await asyncio.wait_for(self._connect(), self.timeout)
+                replies = await asyncio.wait_for(
+                    self._roundtrip(connection, *commands), self.timeout
+                )
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, RedisError) as e:
+                if connection is not None:
+                    connection[1].close()
+                self._down_until = time.monotonic() + self.retry_after
+                logger.warning(f"Cache backend unavailable: {e}")
+                return None
+            self._pool.put_nowait(connection)
+            return replies
+
+    async def get(self, namespace: str, key: str) -> Optional[bytes]:
+        replies = await self._execute(("HGET", namespace, key))
+        if not replies or replies[0] is None:
+            return None
+        expires_at, _, value = replies[0].partition(b"\n")
+        if float(expires_at) <= time.time():
+            return None
+        return value
+
+    async def set(self, namespace: str, key: str, value: bytes, ttl: float):
+        entry = b"%f\n%s" % (time.time() + ttl, value)
+        await self._execute(
+            ("HSET", namespace, key, entry),
+            ("PEXPIRE", namespace, int(ttl * 1000)),
+        )
+
+    async def delete(self, namespace: str, *keys: str):
+        if keys:
+            await self._execute(("HDEL", namespace, *keys))
+
+    async def clear(self, namespace: str):
+        await self._execute(("DEL", namespace))
+
+    async def close(self):
+        while not self._pool.empty():
+            _, writer = self._pool.get_nowait()
+            writer.close()
+
+
+class ReadThroughCache:
+    """Caches serialized JSON responses by namespace and key.
+
+    Hits are returned as raw JSON without touching the database or
+    re-validating the response model. Cached routes get their ETag from the
+    body actually served (see `ConditionalRequestMiddleware`), never from a
+    row version, so a copy that is stale in one process cannot be confirmed
+    with a 304 once it expires. For `settle` seconds after a namespace
+    is invalidated, loaded values are served but not stored, since a lagging
+    read replica may still return the old rows.
+    """
+
+    def __init__(self, backend: CacheBackend, settle: float = 0.0):
+        self.backend = backend
+        self.settle = settle
+        self._invalidated_at: dict[str, float] = {}
+        self.hits: dict[str, int] = defaultdict(int)
+        self.misses: dict[str, int] = defaultdict(int)
+        self._adapters: dict[Any, TypeAdapter] = {}
+
+    def _adapter(self, response_type: Any) -> TypeAdapter:
+        adapter = self._adapters.get(response_type)
+        if adapter is None:
+            adapter = self._adapters[response_type] = TypeAdapter(response_type)
+        return adapter
+
+    async def fetch(
+        self,
+        namespace: str,
+        key: Any,
+        response_type: Any,
+        load: Callable[[], Awaitable[Any]],
+        ttl: float,
+        cache_control: Optional[str] = None,
+    ) -> Response:
+        key = str(key)
+        body = await self.backend.get(namespace, key)
+        if body is not None:
+            self.hits[namespace] += 1
+        else:
+            self.misses[namespace] += 1
+            adapter = self._adapter(response_type)
+            value = adapter.validate_python(await load(), from_attributes=True)
+            body = adapter.dump_json(value)
+            if time.monotonic() - self._invalidated_at.get(namespace, -math.inf) >= self.settle:
+                await self.backend.set(namespace, key, body, ttl)
+        headers = {"Cache-Control": cache_control} if cache_control else None
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def invalidate(self, namespace: str, *keys: Any):
+        """Drop the given keys, or the whole namespace when none are given."""
+        self._invalidated_at[namespace] = time.monotonic()
+        if keys:
+            await self.backend.delete(namespace, *(str(key) for key in keys))
+        else:
+            await self.backend.clear(namespace)
+
+    def metrics(self) -> dict:
+        namespaces = {}
+        for namespace in sorted(set(self.hits) | set(self.misses)):
+            hits, misses = self.hits[namespace], self.misses[namespace]
+            namespaces[namespace] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            }
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "namespaces": namespaces,
+        }
+
+
+def _make_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisBackend(settings.CACHE_REDIS_URL, pool_size=settings.CACHE_REDIS_POOL_SIZE)
+    return MemoryBackend(maxsize=settings.CACHE_MAX_ENTRIES)
+
+
+read_cache = ReadThroughCache(
+    _make_backend(),
+    settle=settings.POSTGRES_REPLICA_MAX_LAG if settings.replica_urls else 0.0,
+)
@@ -1,7 +1,12 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import LRUCache
 from app.core.config import settings
 from app.model.model import User
 from fastapi import Depends, HTTPException, status, Request
@@ -10,6 +15,9 @@ from jose import JWTError, jwt
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+# Decoded JWT payloads keyed by token digest, kept until the token's `exp`
+# (capped at TOKEN_CACHE_TTL seconds).
+token_cache = LRUCache(maxsize=settings.TOKEN_CACHE_SIZE)
 
 
 def verify_password(plain, hashed):
@@ -20,11 +28,96 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """Runs bcrypt hashing and verification in a bounded worker pool.
+
+    At most `workers` hashes run at once; callers beyond that wait, and once
+    `max_pending` are waiting new calls are rejected with 503 so a login spike
+    cannot pile up unbounded work.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.PASSWORD_HASH_WORKERS,
+        use_processes: bool = settings.PASSWORD_HASH_USE_PROCESSES,
+        max_pending: int = settings.PASSWORD_HASH_MAX_PENDING,
+    ):
+        self.workers = workers
+        self.use_processes = use_processes
+        self.max_pending = max_pending
+        self._executor: Executor | None = None
+        self._slots = asyncio.Semaphore(workers)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.calls = 0
+        self.seconds = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def run(self, fn, *args):
+        if self.waiting >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.calls += 1
+            self.seconds += time.perf_counter() - start
+            self._slots.release()
+
+    async def verify(self, plain, hashed) -> bool:
+        return await self.run(verify_password, plain, hashed)
+
+    async def hash(self, password) -> str:
+        return await self.run(get_password_hash, password)
+
+    def metrics(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "calls": self.calls,
+            "seconds": self.seconds,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+
 async def authenticate_user(username: str, password: str, db: AsyncSession):
     stmt = select(User).where(User.username == username)
     res = await db.execute(stmt)
     user = res.scalars().first()
-    if not user or not verify_password(password, user.password):
+    if not user or not await password_hasher.verify(password, user.password):
         return None
     return user
 
@@ -42,17 +135,45 @@ async def authenticate_token(request: Request, token: str = Depends(oauth2_schem
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(digest)
+    if payload is None:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+        except JWTError:
+            raise credentials_exception
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-        request.state.user = payload
-        return payload
-    except JWTError:
-        raise credentials_exception
+        expires_at = time.time() + settings.TOKEN_CACHE_TTL
+        if "exp" in payload:
+            expires_at = min(expires_at, payload["exp"])
+        token_cache.set(digest, payload, expires_at)
+    request.state.user = payload
+    return payload
+
+
+def token_subject(request: Request) -> str | None:
+    """`sub` of the request's bearer token, or None when it has no valid one.
+
+    Unlike `authenticate_token` this never rejects the request, so it can be
+    used on routes that do not require a login.
+    """
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user.get("sub")
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = token_cache.get(hashlib.sha256(token.encode()).digest())
+    if payload is None:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            return None
+    return payload.get("sub")
 
 
 def current_user(request: Request):
@@ -1,3 +1,4 @@
+import asyncio
 import os
 from collections.abc import AsyncGenerator, Callable
 from contextlib import AbstractAsyncContextManager, asynccontextmanager
@@ -13,10 +14,18 @@ from .config import (
     EnvironmentOption,
     EnvironmentSettings,
 )
-from .db import run_async_migrations
+from .db import replica_router, run_async_migrations
+from .feed import feed_pruner
+from .images import image_processor
 from .logger import logger
+from .qr import qr_renderer
+from .read_cache import read_cache
+from .mail import smtp_pool
+from .mail_queue import mail_queue
 from .middleware import setup_middlewares
-from fastapi.staticfiles import StaticFiles
+from .security import password_hasher
+from .uploads import blob_collector
+from .static import CachedStaticFiles, precompress_tree
 
 
 def lifespan_factory(
@@ -33,7 +42,28 @@ def lifespan_factory(
             except Exception as e:
                 logger.critical(f"Migration failed: {e}")
 
-        yield
+        if os.path.isdir("static"):
+            await asyncio.to_thread(precompress_tree, "static")
+
+        await replica_router.start()
+        if settings.mail_enabled:
+            await mail_queue.start()
+        else:
+            logger.warning("SMTP_SENDER_EMAIL is not set, mail delivery is disabled")
+        await blob_collector.start()
+        await feed_pruner.start()
+        try:
+            yield
+        finally:
+            await feed_pruner.stop()
+            await blob_collector.stop()
+            await mail_queue.stop()
+            await replica_router.stop()
+            await asyncio.to_thread(smtp_pool.close)
+            password_hasher.shutdown()
+            image_processor.shutdown()
+            qr_renderer.shutdown()
+            await read_cache.backend.close()
 
     return lifespan
 
@@ -76,7 +106,9 @@ def create_application(
     os.makedirs("uploads", exist_ok=True)
 
     # Mount the static folder
-    application.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+    application.mount(
+        "/uploads", CachedStaticFiles(directory="uploads"), name="uploads"
+    )
 
     if isinstance(settings, EnvironmentSettings):
         if settings.ENVIRONMENT != EnvironmentOption.PRODUCTION:
@@ -0,0 +1,137 @@
+import gzip
+import os
+import re
+from mimetypes import guess_type
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from .config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; only .gz siblings are written then
+    brotli = None
+
+# Blob names start with the SHA-256 of their content, so their bytes never change.
+_CONTENT_ADDRESSED = re.compile(r"^[0-9a-f]{64}(\.|$)")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".json", ".svg", ".txt", ".html", ".xml"}
+# Preferred first when the client accepts several encodings.
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def accepted_encodings(header: str) -> dict[str, float]:
+    """q-value of each coding in an Accept-Encoding header, `*` included."""
+    accepted = {}
+    for item in header.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with strong ETags, long-lived caching and precompressed files.
+
+    Content-addressed files are served with `Cache-Control: immutable`; other
+    files may be revalidated after `STATIC_MAX_AGE` seconds. When the client
+    accepts it and a `.br`/`.gz` sibling exists, the sibling is sent instead.
+    Range requests are handled by `FileResponse`.
+    """
+
+    def file_response(
+        self,
+        full_path: str | os.PathLike[str],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        served_path, served_stat, encoding = self._select_encoding(
+            full_path, stat_result, request_headers
+        )
+        response = FileResponse(
+            served_path,
+            status_code=status_code,
+            stat_result=served_stat,
+            media_type=guess_type(str(full_path))[0] or "text/plain",
+        )
+
+        name = os.path.basename(full_path)
+        if _CONTENT_ADDRESSED.match(name):
+            tag = name
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            tag = f"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"
+            response.headers["cache-control"] = (
+                f"public, max-age={settings.STATIC_MAX_AGE}"
+            )
+        if encoding:
+            tag = f"{tag}-{encoding}"
+            response.headers["content-encoding"] = encoding
+        response.headers["etag"] = f'"{tag}"'
+        response.headers["vary"] = "Accept-Encoding"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def _select_encoding(
+        self,
+        full_path: str | os.PathLike[str],
+        stat_result: os.stat_result,
+        request_headers: Headers,
+    ) -> tuple[str | os.PathLike[str], os.stat_result, str | None]:
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        wildcard = accepted.get("*", 0.0)
+        q = {encoding: accepted.get(encoding, wildcard) for encoding, _ in _ENCODINGS}
+        # Highest q-value first; sorted() is stable, so ties keep `_ENCODINGS` order.
+        for encoding, suffix in sorted(_ENCODINGS, key=lambda item: -q[item[0]]):
+            if q[encoding] <= 0:
+                continue
+            sibling = f"{full_path}{suffix}"
+            try:
+                sibling_stat = os.stat(sibling)
+            except OSError:
+                continue
+            if sibling_stat.st_mtime >= stat_result.st_mtime:
+                return sibling, sibling_stat, encoding
+        return full_path, stat_result, None
+
+
+def precompress_tree(directory: str | os.PathLike[str]) -> int:
+    """Write `.gz` (and `.br` when brotli is installed) siblings for text assets.
+
+    Siblings newer than their source are left alone. Returns the number written.
+    """
+    written = 0
+    for path in Path(directory).rglob("*"):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        data = None
+        mtime = path.stat().st_mtime
+        compressors = [(".gz", lambda raw: gzip.compress(raw, 9, mtime=0))]
+        if brotli is not None:
+            compressors.append((".br", brotli.compress))
+        for suffix, compress in compressors:
+            sibling = path.with_name(path.name + suffix)
+            if sibling.exists() and sibling.stat().st_mtime >= mtime:
+                continue
+            if data is None:
+                data = path.read_bytes()
+            sibling.write_bytes(compress(data))
+            written += 1
+    return written
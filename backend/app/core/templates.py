@@ -0,0 +1,47 @@
+import html
+import os
+import re
+from functools import lru_cache
+from typing import Any
+
+from .config import app_path
+
+templates_path = os.path.join(app_path, "templates")
+
+_FIELD = re.compile(r"\{\{\s*(\w+)\s*(\|\s*safe\s*)?\}\}")
+
+
+class Template:
+    """A template compiled once into its static chunks and placeholder slots.
+
+    Placeholders are written `{{ name }}` and are HTML-escaped on render;
+    `{{ name|safe }}` inserts the value as-is. Rendering only joins the
+    precomputed static chunks with the escaped values.
+    """
+
+    def __init__(self, source: str):
+        self.chunks: list[str] = []
+        self.fields: list[tuple[str, bool]] = []
+        position = 0
+        for match in _FIELD.finditer(source):
+            self.chunks.append(source[position : match.start()])
+            self.fields.append((match.group(1), match.group(2) is not None))
+            position = match.end()
+        self.chunks.append(source[position:])
+
+    def render(self, **context: Any) -> str:
+        if not self.fields:
+            return self.chunks[0]
+        out = [self.chunks[0]]
+        for (name, safe), chunk in zip(self.fields, self.chunks[1:]):
+            value = str(context[name])
+            out.append(value if safe else html.escape(value))
+            out.append(chunk)
+        return "".join(out)
+
+
+@lru_cache(maxsize=None)
+def get_template(name: str) -> Template:
+    """Load and compile `templates/<name>`; each template is parsed only once."""
+    with open(os.path.join(templates_path, name), encoding="utf-8") as f:
+        return Template(f.read())
@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import func, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.model.model import Business, BusinessOffer, User
+
+from .config import settings
+from .db import async_session
+from .logger import logger
+from .metrics import upload_bytes, uploads
+
+BLOB_DIR = Path("uploads") / "blobs"
+BLOB_URL_PREFIX = "/uploads/blobs/"
+_EXTENSION = re.compile(r"^\.[a-z0-9]{1,10}$")
+
+
+def url_to_path(url: str) -> Path:
+    return Path(url.lstrip("/"))
+
+
+def _write_chunk(buffer: BinaryIO, digest, chunk: bytes):
+    digest.update(chunk)
+    buffer.write(chunk)
+
+
+def _discard(buffer: BinaryIO, path: Path):
+    buffer.close()
+    path.unlink(missing_ok=True)
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File exceeds the maximum upload size of {max_size} bytes",
+    )
+
+
+async def save_upload(
+    file: UploadFile,
+    file_path: Path,
+    max_size: int = settings.MAX_UPLOAD_SIZE,
+    chunk_size: int = settings.UPLOAD_CHUNK_SIZE,
+) -> tuple[int, str]:
+    """Stream `file` to `file_path` one chunk at a time, off the event loop.
+
+    The size limit is enforced while streaming and the SHA-256 of the content
+    is computed during the copy. Data is written to a `.part` file that is only
+    moved into place once complete. Returns `(size, sha256 hexdigest)`.
+    """
+    if file.size is not None and file.size > max_size:
+        raise _too_large(max_size)
+
+    partial_path = file_path.with_name(file_path.name + ".part")
+    digest = hashlib.sha256()
+    size = 0
+    buffer = await asyncio.to_thread(open, partial_path, "wb")
+    try:
+        while chunk := await file.read(chunk_size):
+            size += len(chunk)
+            if size > max_size:
+                raise _too_large(max_size)
+            await asyncio.to_thread(_write_chunk, buffer, digest, chunk)
+    except BaseException:
+        await asyncio.to_thread(_discard, buffer, partial_path)
+        raise
+    await asyncio.to_thread(buffer.close)
+    await asyncio.to_thread(os.replace, partial_path, file_path)
+    uploads.inc()
+    upload_bytes.inc(amount=size)
+    return size, digest.hexdigest()
+
+
+def _commit_blob(partial_path: Path, blob_path: Path):
+    if blob_path.exists():
+        # Identical content is already stored; keep the existing blob but
+        # refresh its mtime so the GC grace period starts over.
+        partial_path.unlink(missing_ok=True)
+        os.utime(blob_path)
+        return
+    blob_path.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(partial_path, blob_path)
+
+
+async def store_upload(file: UploadFile) -> tuple[str, int, str]:
+    """Store `file` in the content-addressed blob store.
+
+    Blobs are named by the SHA-256 of their content, so uploading the same file
+    twice stores it once. Returns `(url, size, sha256 hexdigest)`.
+    """
+    tmp_dir = BLOB_DIR / "tmp"
+    await asyncio.to_thread(tmp_dir.mkdir, parents=True, exist_ok=True)
+    partial_path = tmp_dir / uuid.uuid4().hex
+    size, checksum = await save_upload(file, partial_path)
+
+    extension = Path(file.filename or "").suffix.lower()
+    if not _EXTENSION.match(extension):
+        extension = ""
+    url = f"{BLOB_URL_PREFIX}{checksum[:2]}/{checksum}{extension}"
+    await asyncio.to_thread(_commit_blob, partial_path, url_to_path(url))
+    return url, size, checksum
+
+
+async def reference_counts(db: AsyncSession) -> dict[str, int]:
+    """Number of `User`, `Business` and `BusinessOffer` references per blob URL."""
+    references = union_all(
+        select(User.profile_photo.label("url")),
+        select(Business.cover_photo),
+        select(func.unnest(func.string_to_array(Business.photos, ","))),
+        select(BusinessOffer.photo),
+    ).subquery()
+    result = await db.execute(
+        select(references.c.url, func.count())
+        .where(references.c.url.startswith(BLOB_URL_PREFIX))
+        .group_by(references.c.url)
+    )
+    return dict(result.all())
+
+
+def _sweep_blobs(referenced: set[str], grace: float) -> int:
+    if not BLOB_DIR.exists():
+        return 0
+    cutoff = time.time() - grace
+    removed = 0
+    for path in BLOB_DIR.rglob("*"):
+        if not path.is_file():
+            continue
+        # Derivatives (`<sha>.thumb.webp`, ...) live and die with their blob.
+        checksum = path.name.split(".")[0]
+        if checksum in referenced or path.stat().st_mtime > cutoff:
+            continue
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+async def collect_garbage(db: AsyncSession, grace: float = settings.BLOB_GC_GRACE) -> int:
+    """Delete blobs no row references any more, and stale partial uploads.
+
+    Files younger than `grace` seconds are kept: an offer photo is uploaded
+    before the offer that references it is created.
+    """
+    counts = await reference_counts(db)
+    referenced = {url_to_path(url).name.split(".")[0] for url in counts}
+    return await asyncio.to_thread(_sweep_blobs, referenced, grace)
+
+
+class BlobCollector:
+    """Periodically garbage-collects orphaned blobs."""
+
+    def __init__(self, interval: float = settings.BLOB_GC_INTERVAL):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                async with async_session() as db:
+                    removed = await collect_garbage(db)
+                if removed:
+                    logger.info(f"Removed {removed} orphaned upload files")
+            except Exception as e:
+                logger.error(f"Blob garbage collection failed: {e}")
+
+
+blob_collector = BlobCollector()
@@ -2,9 +2,8 @@ from app.api import router
 
 from .core.config import settings
 from .core.setup import create_application
-from fastapi.staticfiles import StaticFiles
-from fastapi import FastAPI
+from .core.static import CachedStaticFiles
 
 app = create_application(router=router, settings=settings)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", CachedStaticFiles(directory="static"), name="static")
 
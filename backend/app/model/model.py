@@ -6,16 +6,22 @@ import uuid
 from sqlalchemy import (
     UUID,
     Column,
+    Computed,
+    DateTime,
+    Float,
     ForeignKey,
+    Index,
     String,
     Text,
     Time,
     Integer,
     Table,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import ENUM as PgEnum
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.dialects.postgresql import UUID as PgUUID
 
 from app.core.db import Base
@@ -33,6 +39,7 @@ user_category = Table(
 
 class User(Base):
     __tablename__ = "user"
+    __table_args__ = (Index("ix_user_created_at_id", "created_at", "id"),)
 
     id: Mapped[UUID] = mapped_column(
         PgUUID, primary_key=True, server_default=func.uuid_generate_v4()
@@ -43,11 +50,12 @@ class User(Base):
     phone_number: Mapped[Optional[str]] = mapped_column(String)
     address: Mapped[Optional[str]] = mapped_column(Text)
     profile_photo: Mapped[Optional[str]] = mapped_column(Text)
+    profile_photo_variants: Mapped[Optional[dict]] = mapped_column(JSONB)
     created_at: Mapped[datetime] = mapped_column(
         server_default=func.now()
     )
     updated_at: Mapped[datetime] = mapped_column(
-        server_default=func.now(), onupdate=func.now()
+        server_default=func.clock_timestamp(), onupdate=func.clock_timestamp()
     )
     deleted_at: Mapped[Optional[datetime]] = mapped_column()
 
@@ -71,10 +79,22 @@ class Business(Base):
     address: Mapped[Optional[str]] = mapped_column(Text)
     targeted_gender: Mapped[Optional[str]]
     cover_photo: Mapped[Optional[str]] = mapped_column(Text)
+    cover_photo_variants: Mapped[Optional[dict]] = mapped_column(JSONB)
     start_hour: Mapped[Optional[str]] 
     close_hour: Mapped[Optional[str]]
     opening_days: Mapped[Optional[str]] = mapped_column(Text)
     photos: Mapped[Optional[str]] = mapped_column(Text)
+    latitude: Mapped[Optional[float]] = mapped_column(Float)
+    longitude: Mapped[Optional[float]] = mapped_column(Float)
+    updated_at: Mapped[datetime] = mapped_column(server_default=func.clock_timestamp())
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(branch_name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(address, '')), 'B')"
+        ),
+        deferred=True,
+    )
 
     # Relationships
     user: Mapped["User"] = relationship(back_populates="business")
@@ -92,6 +112,7 @@ class Customer(Base):
     age: Mapped[Optional[int]] = mapped_column(Integer)
     price_range: Mapped[Optional[str]]
     gender: Mapped[Optional[str]]
+    updated_at: Mapped[datetime] = mapped_column(server_default=func.clock_timestamp())
 
     # Relationships
     user: Mapped["User"] = relationship(back_populates="customer")
@@ -105,6 +126,7 @@ class Category(Base):
     )
     key: Mapped[str] = mapped_column(String, unique=True, nullable=False)
     name: Mapped[str] = mapped_column(String, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(server_default=func.clock_timestamp())
 
     # Relationships
     users: Mapped[List["User"]] = relationship(
@@ -124,9 +146,79 @@ class BusinessOffer(Base):
     start_date: Mapped[datetime] = mapped_column(nullable=False)
     end_date: Mapped[datetime] = mapped_column(nullable=False)
     photo: Mapped[Optional[str]] = mapped_column(Text)
+    photo_variants: Mapped[Optional[dict]] = mapped_column(JSONB)
 
     redemption_code: Mapped[str] = mapped_column(String, default=lambda: uuid.uuid4().hex, unique=True)
     qr_code_path: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(server_default=func.clock_timestamp())
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+        ),
+        deferred=True,
+    )
 
     # Relationships
-    business: Mapped["Business"] = relationship(back_populates="offers")
\ No newline at end of file
+    business: Mapped["Business"] = relationship(back_populates="offers")
+
+    __table_args__ = (
+        Index("ix_business_offer_business_id", "business_id"),
+        Index("ix_business_offer_start_date_id", "start_date", "id"),
+        Index("ix_business_offer_end_date_id", "end_date", "id"),
+    )
+
+
+class OfferRedemption(Base):
+    __tablename__ = "offer_redemption"
+    __table_args__ = (
+        UniqueConstraint("offer_id", "user_id", name="uq_offer_redemption_offer_user"),
+    )
+
+    id: Mapped[UUID] = mapped_column(
+        PgUUID, primary_key=True, server_default=func.uuid_generate_v4()
+    )
+    offer_id: Mapped[UUID] = mapped_column(PgUUID, ForeignKey("business_offer.id"))
+    user_id: Mapped[UUID] = mapped_column(PgUUID, ForeignKey("user.id"))
+    redeemed_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+
+class OfferFeed(Base):
+    """Precomputed customer/offer matches, maintained by database triggers."""
+
+    __tablename__ = "offer_feed"
+
+    user_id: Mapped[UUID] = mapped_column(
+        PgUUID, ForeignKey("user.id"), primary_key=True
+    )
+    offer_id: Mapped[UUID] = mapped_column(
+        PgUUID, ForeignKey("business_offer.id"), primary_key=True
+    )
+    score: Mapped[int] = mapped_column(Integer, nullable=False)
+    end_date: Mapped[datetime] = mapped_column(nullable=False)
+
+
+class MailStatus(str, Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class MailOutbox(Base):
+    __tablename__ = "mail_outbox"
+
+    id: Mapped[UUID] = mapped_column(
+        PgUUID, primary_key=True, server_default=func.uuid_generate_v4()
+    )
+    recipients: Mapped[str] = mapped_column(Text, nullable=False)
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(String, default=MailStatus.PENDING.value)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    next_attempt_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    # TIMESTAMPTZ like the migration: the lease is matched on the exact value read back.
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    sent_at: Mapped[Optional[datetime]] = mapped_column()
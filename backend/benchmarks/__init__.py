@@ -0,0 +1,39 @@
+"""Micro- and load benchmarks backing the performance claims of app.core.
+
+Run from backend/, e.g. `python -m benchmarks.templates`. They are not part
+of the test suite and print their numbers instead of asserting on them.
+"""
+import os
+import statistics
+import time
+from typing import Callable
+
+# Settings are read at import time; SECRET_KEY has no default.
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+
+def per_call(fn: Callable[[], object], repeat: int = 5, number: int = 2000) -> float:
+    """Best-of-`repeat` seconds per call of `fn`, each run timing `number` calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """p50/p99/max of `samples` (seconds), in milliseconds."""
+    # quantiles() needs two points, and a starved probe may only get one.
+    points = samples * 2 if len(samples) == 1 else samples
+    cuts = statistics.quantiles(points, n=100, method="inclusive")
+    return {
+        "p50_ms": cuts[49] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def us(seconds: float) -> str:
+    return f"{seconds * 1e6:8.2f} us"
@@ -0,0 +1,103 @@
+"""Per-request overhead of `MetricsMiddleware` and the cost of a scrape.
+
+    python -m benchmarks.metrics
+
+The same FastAPI app, with and without the middleware, is called directly
+through ASGI with a canned request, so HTTP client and socket costs do not
+hide the difference. "bookkeeping" times just the counter, gauge and
+histogram updates the middleware makes per request. The scrape timing renders the registry after the
+requests have filled in a series for each of `ROUTES` routes.
+"""
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from benchmarks import per_call, us
+
+from app.core.metrics import (
+    MetricsMiddleware,
+    http_in_flight,
+    http_latency,
+    http_requests,
+    registry,
+)
+
+ROUTES = 30
+REQUESTS = 20000
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+    for i in range(ROUTES):
+
+        @app.get(f"/items{i}/{{item_id}}")
+        async def item(item_id: int):
+            return {"id": item_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def per_request(apps: dict[str, FastAPI]) -> dict[str, float]:
+    """Best seconds per request of each app, alternating between them per round."""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    def scope(i: int) -> dict:
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": f"/items{i % ROUTES}/{i}",
+            "raw_path": f"/items{i % ROUTES}/{i}".encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"bench")],
+            "client": ("127.0.0.1", 1234),
+            "server": ("bench", 80),
+        }
+
+    best = {name: float("inf") for name in apps}
+    for name, app in apps.items():
+        await app(scope(0), receive, send)  # Build the middleware stack
+    for _ in range(5):
+        for name, app in apps.items():
+            start = time.perf_counter()
+            for i in range(REQUESTS):
+                await app(scope(i), receive, send)
+            best[name] = min(best[name], (time.perf_counter() - start) / REQUESTS)
+    return best
+
+
+def main():
+    best = asyncio.run(
+        per_request({"bare": build_app(False), "instrumented": build_app(True)})
+    )
+    bare, instrumented = best["bare"], best["instrumented"]
+    print(f"without metrics  {us(bare)} per request")
+    print(f"with metrics     {us(instrumented)} per request")
+    print(f"overhead         {us(instrumented - bare)} ({(instrumented / bare - 1) * 100:.1f}%)")
+
+    def bookkeeping():
+        http_in_flight.inc()
+        http_in_flight.dec()
+        http_latency.observe(0.0042, "GET", "/items0/{item_id}")
+        http_requests.inc("GET", "/items0/{item_id}", 200)
+
+    print(f"bookkeeping      {us(per_call(bookkeeping, number=20000))} per request")
+
+    start = time.perf_counter()
+    body = registry.render()
+    print(f"scrape           {us(time.perf_counter() - start)} for {len(body)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Latency of /health while bcrypt logins saturate the server.
+
+    python -m benchmarks.password_hashing [--logins 16] [--seconds 5]
+
+`--logins` clients verify a bcrypt password back to back while one client
+polls /health every 10 ms. The "inline" run checks the password on the event loop, as
+`authenticate_user` did before `PasswordHasher`; the "pool" run goes
+through `password_hasher`. Requests go through the ASGI app in-process, so
+the numbers are the event loop's own latency, without network noise.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from benchmarks import percentiles
+
+from app.api.v1.health import router as health_router
+from app.core.security import PasswordHasher, get_password_hash, verify_password
+
+PASSWORD = "correct horse battery staple"
+PROBE_INTERVAL = 0.01
+
+
+def build_app(hashed: str, hasher: PasswordHasher | None) -> FastAPI:
+    app = FastAPI()
+    app.include_router(health_router)
+
+    @app.post("/login")
+    async def login():
+        if hasher is None:
+            return {"ok": verify_password(PASSWORD, hashed)}
+        return {"ok": await hasher.verify(PASSWORD, hashed)}
+
+    return app
+
+
+async def run(app: FastAPI, logins: int, seconds: float) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + seconds
+        completed = 0
+
+        async def login_loop():
+            nonlocal completed
+            while time.perf_counter() < deadline:
+                await client.post("/login")
+                completed += 1
+
+        async def health_loop() -> list[float]:
+            # Latency counts from when the probe was due, so time spent waiting
+            # for a blocked loop to resume it is included.
+            samples = []
+            due = time.perf_counter()
+            while True:
+                await client.get("/health")
+                finished = time.perf_counter()
+                samples.append(finished - due)
+                if due >= deadline:
+                    return samples
+                due = finished + PROBE_INTERVAL
+                await asyncio.sleep(PROBE_INTERVAL)
+
+        samples, *_ = await asyncio.gather(
+            health_loop(), *(login_loop() for _ in range(logins))
+        )
+    return {"logins_per_s": completed / seconds, "probes": len(samples), **percentiles(samples)}
+
+
+def report(name: str, result: dict):
+    print(
+        f"{name:8} logins/s {result['logins_per_s']:6.1f}  /health probes {result['probes']:4}  "
+        f"p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+        f"max {result['max_ms']:8.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    hashed = get_password_hash(PASSWORD)
+    report("idle", asyncio.run(run(build_app(hashed, None), 0, args.seconds)))
+    report("inline", asyncio.run(run(build_app(hashed, None), args.logins, args.seconds)))
+    hasher = PasswordHasher()
+    try:
+        report("pool", asyncio.run(run(build_app(hashed, hasher), args.logins, args.seconds)))
+    finally:
+        hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
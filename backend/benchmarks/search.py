@@ -0,0 +1,163 @@
+"""Latency of /search/offers over a seeded catalogue of 100k offers.
+
+    BENCHMARK_POSTGRES_DB=vista_bench python -m benchmarks.search [--offers 100000]
+
+Runs against BENCHMARK_POSTGRES_DB on the server named by the POSTGRES_*
+settings, never the application database. The database is migrated, and
+offers built from a small vocabulary are seeded once (1000 businesses with
+`--offers / 1000` offers each). Each query is run through the
+`search_offers` handler `--runs` times. For scale, the same text is also
+run as an unranked `name ILIKE` filter for the first page by id. That stops
+as soon as it has a page, so it is only cheap when the term is common.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks import percentiles
+
+from app.core.config import settings
+
+BENCHMARK_POSTGRES_DB = os.environ.get("BENCHMARK_POSTGRES_DB")
+if not BENCHMARK_POSTGRES_DB or BENCHMARK_POSTGRES_DB == settings.POSTGRES_DB:
+    raise SystemExit("Set BENCHMARK_POSTGRES_DB to a database other than POSTGRES_DB")
+# Must happen before app.core.db builds its engines from these settings.
+settings.POSTGRES_URI = (
+    f"{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@"
+    f"{settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}/{BENCHMARK_POSTGRES_DB}"
+)
+settings.POSTGRES_REPLICA_URLS = ""
+
+from sqlalchemy import text  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+from app.api.v1.pagination import DEFAULT_LIMIT, PageParams  # noqa: E402
+from app.api.v1.search import search_offers  # noqa: E402
+from app.core.db import async_engine, async_session, run_async_migrations  # noqa: E402
+
+BUSINESSES = 1000
+DISHES = [
+    "pizza", "burger", "shawarma", "falafel", "manakish", "tabbouleh", "hummus",
+    "kebab", "sushi", "salad", "croissant", "espresso", "smoothie", "kunafa",
+    "fattoush", "chicken", "steak", "pasta", "taco", "waffle",
+]
+ADJECTIVES = [
+    "crispy", "spicy", "family", "double", "vegan", "grilled", "classic",
+    "giant", "fresh", "homemade", "weekend", "student", "lunch", "late-night",
+]
+QUERIES = {
+    "one word": "shawarma",
+    "two words": "spicy chicken",
+    "phrase": '"family pizza"',
+    "typo": "shawrma",
+    "no match": "zzzzzz",
+}
+
+_SEED = text("""
+    WITH words AS (
+        SELECT CAST(:adjectives AS text[]) AS adj, CAST(:dishes AS text[]) AS dish
+    ), users AS (
+        INSERT INTO "user" (email, username, password)
+        SELECT 'search-bench-' || i || '@example.com', 'search-bench-' || i, 'x'
+        FROM generate_series(1, :businesses) AS i
+        RETURNING id
+    ), businesses AS (
+        INSERT INTO business (user_id, branch_name, address)
+        SELECT id, 'Bench branch ' || row_number() OVER (), 'Beirut'
+        FROM users
+        RETURNING id
+    )
+    INSERT INTO business_offer (business_id, name, description, start_date, end_date)
+    SELECT
+        b.id,
+        initcap(
+            adj[1 + (i * 7 + n) % cardinality(adj)] || ' '
+            || dish[1 + (i * 13 + n * 3) % cardinality(dish)]
+        ) || ' ' || i,
+        'Get a ' || adj[1 + (i + n) % cardinality(adj)] || ' '
+            || dish[1 + (i * 5 + n) % cardinality(dish)] || ' with any order',
+        now() - interval '1 day',
+        now() + interval '30 days'
+    FROM (SELECT id, row_number() OVER () AS n FROM businesses) AS b,
+         generate_series(1, :per_business) AS i,
+         words
+""")
+_SEEDED = text("""
+    SELECT count(*) FROM business_offer o
+    JOIN business b ON b.id = o.business_id
+    JOIN "user" u ON u.id = b.user_id
+    WHERE u.email LIKE 'search-bench-%'
+""")
+_ILIKE = text("SELECT id FROM business_offer WHERE name ILIKE :pattern ORDER BY id LIMIT 51")
+
+
+async def seed(offers: int):
+    async with async_engine.begin() as conn:
+        seeded = (await conn.execute(_SEEDED)).scalar_one()
+        if seeded >= offers:
+            return seeded
+        await conn.execute(
+            _SEED,
+            {
+                "businesses": BUSINESSES,
+                "per_business": offers // BUSINESSES,
+                "adjectives": ADJECTIVES,
+                "dishes": DISHES,
+            },
+        )
+        await conn.execute(text("ANALYZE business_offer"))
+        return (await conn.execute(_SEEDED)).scalar_one()
+
+
+def _page() -> PageParams:
+    request = Request({"type": "http", "query_string": b"", "headers": []})
+    return PageParams(request, limit=DEFAULT_LIMIT, cursor=None)
+
+
+async def time_query(q: str, runs: int) -> tuple[dict, int]:
+    samples = []
+    async with async_session() as db:
+        for _ in range(runs):
+            start = time.perf_counter()
+            page = await search_offers(db, _page(), q)
+            samples.append(time.perf_counter() - start)
+    return percentiles(samples), len(page.items)
+
+
+async def time_ilike(q: str, runs: int) -> dict:
+    samples = []
+    async with async_engine.connect() as conn:
+        for _ in range(runs):
+            start = time.perf_counter()
+            await conn.execute(_ILIKE, {"pattern": f"%{q.strip(chr(34))}%"})
+            samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+async def run(offers: int, runs: int):
+    await run_async_migrations()
+    start = time.perf_counter()
+    seeded = await seed(offers)
+    print(f"{seeded} seeded offers ready in {time.perf_counter() - start:.1f} s")
+    for name, q in QUERIES.items():
+        search, hits = await time_query(q, runs)
+        scan = await time_ilike(q, runs)
+        print(
+            f"{name:10} {q!r:18} hits {hits:3}  "
+            f"search p50 {search['p50_ms']:7.2f} ms p99 {search['p99_ms']:7.2f} ms  "
+            f"ILIKE p50 {scan['p50_ms']:7.2f} ms"
+        )
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--offers", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(run(args.offers, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Throughput of `CachedStaticFiles` against Starlette's plain `StaticFiles`.
+
+    python -m benchmarks.static_files
+
+Both serve the same temporary tree: a ~200 KB JavaScript bundle with the
+siblings `precompress_tree` writes, and a 100 KB content-addressed blob.
+Each case is a burst of sequential GETs in-process through httpx's ASGI
+transport, reporting requests per second and bytes on the wire.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+import benchmarks  # noqa: F401  (sets SECRET_KEY before app settings load)
+
+from app.core.static import CachedStaticFiles, precompress_tree
+
+REQUESTS = 1000
+
+
+def build_tree(root: Path) -> tuple[str, str]:
+    bundle = root / "app.js"
+    bundle.write_text(
+        "".join(f"export function f{i}(x) {{ return x * {i} + {i % 7}; }}\n" for i in range(4000))
+    )
+    precompress_tree(root)
+    blob = os.urandom(100 * 1024)
+    blob_name = f"{hashlib.sha256(blob).hexdigest()}.jpg"
+    (root / blob_name).write_bytes(blob)
+    return "/files/app.js", f"/files/{blob_name}"
+
+
+async def burst(client: httpx.AsyncClient, path: str, headers: dict) -> tuple[float, int, int]:
+    # Read the raw body: httpx would otherwise decompress it and hide the saving.
+    async with client.stream("GET", path, headers=headers) as response:
+        size = sum([len(chunk) async for chunk in response.aiter_raw()])
+        status = response.status_code
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        async with client.stream("GET", path, headers=headers) as response:
+            async for _ in response.aiter_raw():
+                pass
+    return REQUESTS / (time.perf_counter() - start), status, size
+
+
+async def run(files: StaticFiles, bundle: str, blob: str):
+    app = Starlette(routes=[Mount("/files", files)])
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        first = await client.get(bundle)
+        cases = {
+            "bundle, identity": (bundle, {"accept-encoding": "identity"}),
+            "bundle, br/gzip": (bundle, {"accept-encoding": "gzip, br"}),
+            "bundle, revalidate": (bundle, {"if-none-match": first.headers["etag"]}),
+            "blob": (blob, {}),
+        }
+        for name, (path, headers) in cases.items():
+            rate, status, size = await burst(client, path, headers)
+            print(f"  {name:20} {rate:8.0f} req/s  {status}  {size:7} bytes")
+        print(f"  blob cache-control: {(await client.get(blob)).headers.get('cache-control')}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        bundle, blob = build_tree(Path(directory))
+        for name, files in (
+            ("StaticFiles", StaticFiles(directory=directory)),
+            ("CachedStaticFiles", CachedStaticFiles(directory=directory)),
+        ):
+            print(name)
+            asyncio.run(run(files, bundle, blob))
+
+
+if __name__ == "__main__":
+    main()
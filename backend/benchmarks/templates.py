@@ -0,0 +1,50 @@
+"""Cost of rendering one email body with the precompiled templates.
+
+    python -m benchmarks.templates
+
+"compiled" is what the mail endpoints do: render a template parsed once at
+import. "parse + render" compiles the source on every call, which is what
+skipping the `get_template` cache would cost. "escape content only" is the
+part of a render spent HTML-escaping the body. The full message row adds the
+MIME assembly of `create_regular_email` for scale.
+"""
+import html
+
+from benchmarks import per_call, us
+
+from app.api.v1.mail_service import (
+    REGULAR_EMAIL_TEMPLATE,
+    create_contact_us_html_template,
+    create_regular_email,
+    create_regular_email_html_template,
+)
+from app.core.templates import Template, templates_path
+
+BODY = "Lorem ipsum dolor sit amet <b>&</b> consectetur. " * 10  # ~500 characters
+
+
+def main():
+    with open(f"{templates_path}/email/regular_email.html", encoding="utf-8") as f:
+        source = f.read()
+    context = dict(subject="Weekly offers", greeting="", content=BODY, sent_at="now")
+
+    rows = {
+        "regular email, compiled": lambda: REGULAR_EMAIL_TEMPLATE.render(**context),
+        "regular email, parse + render": lambda: Template(source).render(**context),
+        "escape content only": lambda: html.escape(BODY),
+        "regular email helper": lambda: create_regular_email_html_template(
+            "Jane", BODY, "Weekly offers"
+        ),
+        "contact us helper": lambda: create_contact_us_html_template(
+            "Jane <script>", "jane@example.com", BODY
+        ),
+        "full MIME message": lambda: create_regular_email(
+            "jane@example.com", "Weekly offers", BODY, "Jane"
+        ),
+    }
+    for name, fn in rows.items():
+        print(f"{name:32} {us(per_call(fn))} per message")
+
+
+if __name__ == "__main__":
+    main()
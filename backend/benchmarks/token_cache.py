@@ -0,0 +1,77 @@
+"""Per-request cost of `authenticate_token` with and without the token cache.
+
+    python -m benchmarks.token_cache
+
+"dependency" times the dependency alone; "request" times a whole GET to a
+route guarded by `auth_dep`, in-process through httpx's ASGI transport.
+The uncached runs swap in a zero-size `LRUCache`, so every call decodes
+and verifies the JWT, as before the cache existed.
+"""
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from starlette.requests import Request
+
+from benchmarks import us
+
+from app.api.v1.dependencies import auth_dep
+from app.core import security
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+CALLS = 20000
+REQUESTS = 2000
+
+
+async def time_dependency(token: str) -> float:
+    scope = {
+        "type": "http",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "state": {},
+    }
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            await security.authenticate_token(Request(scope), token)
+        best = min(best, (time.perf_counter() - start) / CALLS)
+    return best
+
+
+async def time_requests(token: str) -> float:
+    app = FastAPI()
+
+    @app.get("/protected", dependencies=[auth_dep])
+    async def protected():
+        return {}
+
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(REQUESTS):
+                await client.get("/protected", headers=headers)
+            best = min(best, (time.perf_counter() - start) / REQUESTS)
+    return best
+
+
+def main():
+    token = security.create_access_token({"sub": "jane@example.com"})
+    cached = security.token_cache
+    for name, cache in (("cached", cached), ("uncached", LRUCache(maxsize=0))):
+        security.token_cache = cache
+        try:
+            dependency = asyncio.run(time_dependency(token))
+            request = asyncio.run(time_requests(token))
+        finally:
+            security.token_cache = cached
+        print(f"{name:9} dependency {us(dependency)}   request {us(request)}")
+    print(f"({settings.ALGORITHM}, cache hit ratio {cached.metrics()['hit_ratio']:.3f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""Add keyset pagination indexes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 09:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # business, business_offer and category page on their primary key;
+    # "user" pages on (created_at, id).
+    op.create_index('ix_user_created_at_id', 'user', ['created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_user_created_at_id', table_name='user')
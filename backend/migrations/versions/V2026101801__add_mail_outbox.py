@@ -0,0 +1,40 @@
+"""Add mail outbox
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 10:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE mail_outbox (
+            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            recipients TEXT NOT NULL,
+            message TEXT NOT NULL,
+            status VARCHAR NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            sent_at TIMESTAMPTZ
+        );
+    """)
+    # The queue sweeper only ever looks at due, pending rows.
+    op.execute("""
+        CREATE INDEX ix_mail_outbox_pending
+        ON mail_outbox (next_attempt_at)
+        WHERE status = 'pending';
+    """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS mail_outbox;")
@@ -0,0 +1,31 @@
+"""Add image variant columns
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 11:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user', sa.Column(
+        'profile_photo_variants', postgresql.JSONB(), nullable=True))
+    op.add_column('business', sa.Column(
+        'cover_photo_variants', postgresql.JSONB(), nullable=True))
+    op.add_column('business_offer', sa.Column(
+        'photo_variants', postgresql.JSONB(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('business_offer', 'photo_variants')
+    op.drop_column('business', 'cover_photo_variants')
+    op.drop_column('user', 'profile_photo_variants')
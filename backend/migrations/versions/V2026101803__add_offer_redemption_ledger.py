@@ -0,0 +1,38 @@
+"""Add offer redemption ledger
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 12:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE offer_redemption (
+            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            offer_id UUID NOT NULL,
+            user_id UUID NOT NULL,
+            redeemed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            CONSTRAINT uq_offer_redemption_offer_user UNIQUE (offer_id, user_id),
+            FOREIGN KEY (offer_id) REFERENCES business_offer(id) ON DELETE CASCADE,
+            FOREIGN KEY (user_id) REFERENCES "user"(id) ON DELETE CASCADE
+        );
+    """)
+    # Redemptions are looked up by redemption_code (already unique) and offers
+    # are listed per business.
+    op.create_index(
+        'ix_business_offer_business_id', 'business_offer', ['business_id']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_business_offer_business_id', table_name='business_offer')
+    op.execute("DROP TABLE IF EXISTS offer_redemption;")
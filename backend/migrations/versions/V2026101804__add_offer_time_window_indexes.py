@@ -0,0 +1,30 @@
+"""Add offer time-window indexes
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 13:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # "active" and "ending_soon" range-scan end_date >= now(); "upcoming"
+    # range-scans start_date > now(). The trailing id serves keyset pagination.
+    op.create_index(
+        'ix_business_offer_end_date_id', 'business_offer', ['end_date', 'id']
+    )
+    op.create_index(
+        'ix_business_offer_start_date_id', 'business_offer', ['start_date', 'id']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_business_offer_start_date_id', table_name='business_offer')
+    op.drop_index('ix_business_offer_end_date_id', table_name='business_offer')
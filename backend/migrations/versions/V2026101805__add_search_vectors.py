@@ -0,0 +1,49 @@
+"""Add full-text and trigram search indexes
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 14:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm;')
+
+    # 'simple' avoids language-specific stemming; names and addresses mix
+    # Arabic, English and French.
+    op.execute("""
+        ALTER TABLE business ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(branch_name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(address, '')), 'B')
+        ) STORED;
+    """)
+    op.execute("""
+        ALTER TABLE business_offer ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+        ) STORED;
+    """)
+
+    op.execute("CREATE INDEX ix_business_search_vector ON business USING GIN (search_vector);")
+    op.execute("CREATE INDEX ix_business_branch_name_trgm ON business USING GIN (branch_name gin_trgm_ops);")
+    op.execute("CREATE INDEX ix_business_offer_search_vector ON business_offer USING GIN (search_vector);")
+    op.execute("CREATE INDEX ix_business_offer_name_trgm ON business_offer USING GIN (name gin_trgm_ops);")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_business_offer_name_trgm;")
+    op.execute("DROP INDEX IF EXISTS ix_business_offer_search_vector;")
+    op.execute("DROP INDEX IF EXISTS ix_business_branch_name_trgm;")
+    op.execute("DROP INDEX IF EXISTS ix_business_search_vector;")
+    op.execute("ALTER TABLE business_offer DROP COLUMN IF EXISTS search_vector;")
+    op.execute("ALTER TABLE business DROP COLUMN IF EXISTS search_vector;")
@@ -0,0 +1,34 @@
+"""Add business location
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 15:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # cube/earthdistance ship with Postgres contrib, so no PostGIS install is needed.
+    op.execute('CREATE EXTENSION IF NOT EXISTS cube;')
+    op.execute('CREATE EXTENSION IF NOT EXISTS earthdistance;')
+
+    op.execute("ALTER TABLE business ADD COLUMN latitude DOUBLE PRECISION;")
+    op.execute("ALTER TABLE business ADD COLUMN longitude DOUBLE PRECISION;")
+    op.execute("""
+        CREATE INDEX ix_business_location ON business
+        USING GIST (ll_to_earth(latitude, longitude))
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+    """)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_business_location;")
+    op.execute("ALTER TABLE business DROP COLUMN IF EXISTS longitude;")
+    op.execute("ALTER TABLE business DROP COLUMN IF EXISTS latitude;")
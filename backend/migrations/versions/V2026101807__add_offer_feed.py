@@ -0,0 +1,180 @@
+"""Add precomputed offer feed
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 16:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE offer_feed (
+            user_id UUID NOT NULL,
+            offer_id UUID NOT NULL,
+            score INTEGER NOT NULL,
+            end_date TIMESTAMPTZ NOT NULL,
+            PRIMARY KEY (user_id, offer_id),
+            FOREIGN KEY (user_id) REFERENCES "user"(id) ON DELETE CASCADE,
+            FOREIGN KEY (offer_id) REFERENCES business_offer(id) ON DELETE CASCADE
+        );
+    """)
+    # Feed reads page on (-score, offer_id) within one user.
+    op.execute(
+        "CREATE INDEX ix_offer_feed_user_rank ON offer_feed (user_id, (-score), offer_id);"
+    )
+    op.execute("CREATE INDEX ix_offer_feed_offer_id ON offer_feed (offer_id);")
+    op.execute("CREATE INDEX ix_offer_feed_end_date ON offer_feed (end_date);")
+
+    # Recomputes the feed rows for the given customers and/or offers; NULL
+    # means "all". A customer is matched to an offer through the categories
+    # it shares with the offering business, unless the business targets the
+    # other gender. Each shared category is worth 10, an exact gender match 1.
+    op.execute("""
+        CREATE FUNCTION refresh_offer_feed(p_users UUID[], p_offers UUID[])
+        RETURNS VOID AS $$
+        BEGIN
+            DELETE FROM offer_feed f
+            WHERE (p_users IS NULL OR f.user_id = ANY(p_users))
+              AND (p_offers IS NULL OR f.offer_id = ANY(p_offers));
+
+            INSERT INTO offer_feed (user_id, offer_id, score, end_date)
+            SELECT c.user_id,
+                   o.id,
+                   COUNT(*) * 10
+                       + CASE WHEN b.targeted_gender = c.gender THEN 1 ELSE 0 END,
+                   o.end_date
+            FROM customer c
+            JOIN user_category cc ON cc.user_id = c.user_id
+            JOIN user_category bc ON bc.category_id = cc.category_id
+            JOIN business b ON b.user_id = bc.user_id
+            JOIN business_offer o ON o.business_id = b.id
+            WHERE o.end_date >= NOW()
+              AND (b.targeted_gender IS NULL
+                   OR b.targeted_gender IN ('', 'all')
+                   OR c.gender IS NULL
+                   OR b.targeted_gender = c.gender)
+              AND (p_users IS NULL OR c.user_id = ANY(p_users))
+              AND (p_offers IS NULL OR o.id = ANY(p_offers))
+            GROUP BY c.user_id, o.id, o.end_date, b.targeted_gender, c.gender
+            ON CONFLICT (user_id, offer_id) DO UPDATE
+                SET score = EXCLUDED.score, end_date = EXCLUDED.end_date;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Category changes: a customer's own row set, or every offer of a business.
+    # Statement-level so bulk category writes refresh once.
+    op.execute("""
+        CREATE FUNCTION offer_feed_on_user_category() RETURNS TRIGGER AS $$
+        DECLARE
+            users UUID[];
+            offers UUID[];
+        BEGIN
+            SELECT array_agg(DISTINCT c.user_id) INTO users
+            FROM changed ch JOIN customer c ON c.user_id = ch.user_id;
+            SELECT array_agg(DISTINCT o.id) INTO offers
+            FROM changed ch
+            JOIN business b ON b.user_id = ch.user_id
+            JOIN business_offer o ON o.business_id = b.id;
+
+            IF users IS NOT NULL THEN
+                PERFORM refresh_offer_feed(users, NULL);
+            END IF;
+            IF offers IS NOT NULL THEN
+                PERFORM refresh_offer_feed(NULL, offers);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER offer_feed_user_category_insert
+        AFTER INSERT ON user_category
+        REFERENCING NEW TABLE AS changed
+        FOR EACH STATEMENT EXECUTE FUNCTION offer_feed_on_user_category();
+    """)
+    op.execute("""
+        CREATE TRIGGER offer_feed_user_category_delete
+        AFTER DELETE ON user_category
+        REFERENCING OLD TABLE AS changed
+        FOR EACH STATEMENT EXECUTE FUNCTION offer_feed_on_user_category();
+    """)
+
+    op.execute("""
+        CREATE FUNCTION offer_feed_on_offer() RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM refresh_offer_feed(NULL, ARRAY[NEW.id]);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER offer_feed_offer_change
+        AFTER INSERT OR UPDATE OF business_id, end_date ON business_offer
+        FOR EACH ROW EXECUTE FUNCTION offer_feed_on_offer();
+    """)
+
+    op.execute("""
+        CREATE FUNCTION offer_feed_on_business() RETURNS TRIGGER AS $$
+        DECLARE
+            offers UUID[];
+        BEGIN
+            SELECT array_agg(id) INTO offers
+            FROM business_offer WHERE business_id = NEW.id;
+            IF offers IS NOT NULL THEN
+                PERFORM refresh_offer_feed(NULL, offers);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER offer_feed_business_targeting
+        AFTER UPDATE OF targeted_gender, user_id ON business
+        FOR EACH ROW
+        WHEN (OLD.targeted_gender IS DISTINCT FROM NEW.targeted_gender
+              OR OLD.user_id IS DISTINCT FROM NEW.user_id)
+        EXECUTE FUNCTION offer_feed_on_business();
+    """)
+
+    op.execute("""
+        CREATE FUNCTION offer_feed_on_customer() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM offer_feed WHERE user_id = OLD.user_id;
+            ELSE
+                PERFORM refresh_offer_feed(ARRAY[NEW.user_id], NULL);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER offer_feed_customer_change
+        AFTER INSERT OR DELETE OR UPDATE OF gender, user_id ON customer
+        FOR EACH ROW EXECUTE FUNCTION offer_feed_on_customer();
+    """)
+
+    op.execute("SELECT refresh_offer_feed(NULL, NULL);")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS offer_feed_customer_change ON customer;")
+    op.execute("DROP TRIGGER IF EXISTS offer_feed_business_targeting ON business;")
+    op.execute("DROP TRIGGER IF EXISTS offer_feed_offer_change ON business_offer;")
+    op.execute("DROP TRIGGER IF EXISTS offer_feed_user_category_delete ON user_category;")
+    op.execute("DROP TRIGGER IF EXISTS offer_feed_user_category_insert ON user_category;")
+    op.execute("DROP FUNCTION IF EXISTS offer_feed_on_customer();")
+    op.execute("DROP FUNCTION IF EXISTS offer_feed_on_business();")
+    op.execute("DROP FUNCTION IF EXISTS offer_feed_on_offer();")
+    op.execute("DROP FUNCTION IF EXISTS offer_feed_on_user_category();")
+    op.execute("DROP FUNCTION IF EXISTS refresh_offer_feed(UUID[], UUID[]);")
+    op.execute("DROP TABLE IF EXISTS offer_feed;")
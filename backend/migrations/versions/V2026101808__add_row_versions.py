@@ -0,0 +1,88 @@
+"""Add updated_at row versions
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 17:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ['"user"', 'business', 'customer', 'category', 'business_offer']
+
+
+def upgrade():
+    for table in VERSIONED_TABLES[1:]:
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();"
+        )
+    op.execute('UPDATE "user" SET updated_at = NOW() WHERE updated_at IS NULL;')
+    op.execute('ALTER TABLE "user" ALTER COLUMN updated_at SET NOT NULL;')
+
+    # Bump updated_at on every UPDATE, including raw ones issued outside the
+    # ORM (image variants, feed triggers), so ETags derived from it are exact.
+    op.execute("""
+        CREATE FUNCTION touch_updated_at() RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.updated_at = NOW();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in VERSIONED_TABLES:
+        name = table.strip('"')
+        op.execute(f"""
+            CREATE TRIGGER {name}_touch_updated_at
+            BEFORE UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+        """)
+
+    # A user's categories are part of its representation.
+    op.execute("""
+        CREATE FUNCTION touch_user_on_category_change() RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE "user" SET updated_at = NOW()
+            WHERE id IN (SELECT user_id FROM changed);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER user_category_touch_user_insert
+        AFTER INSERT ON user_category
+        REFERENCING NEW TABLE AS changed
+        FOR EACH STATEMENT EXECUTE FUNCTION touch_user_on_category_change();
+    """)
+    op.execute("""
+        CREATE TRIGGER user_category_touch_user_delete
+        AFTER DELETE ON user_category
+        REFERENCING OLD TABLE AS changed
+        FOR EACH STATEMENT EXECUTE FUNCTION touch_user_on_category_change();
+    """)
+
+    # Collection ETags are max(updated_at) + count(*) over these.
+    op.execute("CREATE INDEX ix_category_updated_at ON category (updated_at);")
+    op.execute(
+        "CREATE INDEX ix_business_offer_business_id_updated_at "
+        "ON business_offer (business_id, updated_at);"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_business_offer_business_id_updated_at;")
+    op.execute("DROP INDEX IF EXISTS ix_category_updated_at;")
+    op.execute("DROP TRIGGER IF EXISTS user_category_touch_user_delete ON user_category;")
+    op.execute("DROP TRIGGER IF EXISTS user_category_touch_user_insert ON user_category;")
+    op.execute("DROP FUNCTION IF EXISTS touch_user_on_category_change();")
+    for table in VERSIONED_TABLES:
+        name = table.strip('"')
+        op.execute(f"DROP TRIGGER IF EXISTS {name}_touch_updated_at ON {table};")
+    op.execute("DROP FUNCTION IF EXISTS touch_updated_at();")
+    op.execute('ALTER TABLE "user" ALTER COLUMN updated_at DROP NOT NULL;')
+    for table in VERSIONED_TABLES[1:]:
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS updated_at;")
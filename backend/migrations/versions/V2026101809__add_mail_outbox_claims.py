@@ -0,0 +1,30 @@
+"""Add mail outbox claims
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 18:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE mail_outbox ADD COLUMN claimed_at TIMESTAMPTZ;")
+    # The sweeper looks for claims whose lease ran out.
+    op.execute("""
+        CREATE INDEX ix_mail_outbox_sending
+        ON mail_outbox (claimed_at)
+        WHERE status = 'sending';
+    """)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_mail_outbox_sending;")
+    op.execute("UPDATE mail_outbox SET status = 'pending' WHERE status = 'sending';")
+    op.execute("ALTER TABLE mail_outbox DROP COLUMN IF EXISTS claimed_at;")
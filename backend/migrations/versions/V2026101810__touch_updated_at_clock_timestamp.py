@@ -0,0 +1,49 @@
+"""Stamp row versions with clock_timestamp()
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18 19:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+
+def _touch_functions(now: str):
+    # NOW() is the transaction start time, so a long transaction could commit
+    # an updated_at below the current maximum and leave collection ETags as
+    # they were; clock_timestamp() is the time of the change itself.
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.updated_at = {now};
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION touch_user_on_category_change() RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE "user" SET updated_at = {now}
+            WHERE id IN (SELECT user_id FROM changed);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+
+def upgrade():
+    _touch_functions("clock_timestamp()")
+    for table in ['"user"', 'business', 'customer', 'category', 'business_offer']:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN updated_at SET DEFAULT clock_timestamp();")
+
+
+def downgrade():
+    for table in ['"user"', 'business', 'customer', 'category', 'business_offer']:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN updated_at SET DEFAULT NOW();")
+    _touch_functions("NOW()")
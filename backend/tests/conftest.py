@@ -0,0 +1,77 @@
+import asyncio
+import os
+
+import pytest
+
+# Settings are read at import time; SECRET_KEY has no default.
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.core.config import settings  # noqa: E402
+
+# Database tests migrate and write to TEST_POSTGRES_DB on the configured
+# server, never to the application database.
+TEST_POSTGRES_DB = os.environ.get("TEST_POSTGRES_DB")
+if TEST_POSTGRES_DB and TEST_POSTGRES_DB == settings.POSTGRES_DB:
+    raise pytest.UsageError(
+        f"TEST_POSTGRES_DB must not be the application database ({settings.POSTGRES_DB})"
+    )
+if TEST_POSTGRES_DB:
+    # Must happen before app.core.db builds its engines from these settings.
+    settings.POSTGRES_URI = (
+        f"{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@"
+        f"{settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}/{TEST_POSTGRES_DB}"
+    )
+    settings.POSTGRES_REPLICA_URLS = ""
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+from app.core.db import (  # noqa: E402
+    DATABASE_URL,
+    async_engine,
+    connect_args,
+    run_async_migrations,
+)
+
+
+async def _prepare_database() -> str | None:
+    engine = create_async_engine(
+        DATABASE_URL, poolclass=NullPool, connect_args=connect_args()
+    )
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return f"PostgreSQL is not reachable ({e})"
+    finally:
+        await engine.dispose()
+    await run_async_migrations()
+    return None
+
+
+@pytest.fixture(scope="session")
+def database():
+    """Migrated TEST_POSTGRES_DB on the server named by the POSTGRES_* settings.
+
+    Tests that need it are skipped when TEST_POSTGRES_DB is unset or the
+    server cannot be reached.
+    """
+    if not TEST_POSTGRES_DB:
+        pytest.skip("TEST_POSTGRES_DB is not set")
+    reason = asyncio.run(_prepare_database())
+    if reason:
+        pytest.skip(reason)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def engine(database):
+    # Pooled connections belong to the event loop that opened them, and every
+    # test runs in a fresh loop.
+    yield async_engine
+    await async_engine.dispose()
@@ -0,0 +1,45 @@
+from fastapi import FastAPI, UploadFile
+from fastapi.testclient import TestClient
+
+from app.core.middleware import BodySizeLimitMiddleware
+
+
+def _client(reads: list) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, max_size=1024)
+
+    @app.post("/upload")
+    async def upload(file: UploadFile):
+        reads.append(await file.read())
+        return {}
+
+    return TestClient(app)
+
+
+def test_declared_length_over_the_limit_is_rejected_unread():
+    reads = []
+    response = _client(reads).post("/upload", files={"file": ("a.bin", b"x" * 2048)})
+
+    assert response.status_code == 413
+    assert reads == []
+
+
+def test_streamed_body_over_the_limit_is_rejected_before_parsing():
+    reads = []
+    chunks = (b"x" * 512 for _ in range(4))
+    response = _client(reads).post(
+        "/upload",
+        content=chunks,
+        headers={"content-type": "multipart/form-data; boundary=b"},
+    )
+
+    assert response.status_code == 413
+    assert reads == []
+
+
+def test_small_upload_passes():
+    reads = []
+    response = _client(reads).post("/upload", files={"file": ("a.bin", b"x" * 100)})
+
+    assert response.status_code == 200
+    assert reads == [b"x" * 100]
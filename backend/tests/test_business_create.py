@@ -0,0 +1,63 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+
+from app.api.v1.business import BusinessCreate, create_business
+from app.core.db import async_session
+from app.model.model import Business, Category, User, user_category
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_create_business_creates_its_user_and_links_categories(engine):
+    tag = uuid.uuid4().hex
+    email = f"{tag}@example.com"
+    async with async_session() as db:
+        categories = [Category(key=f"test-{tag}-{i}", name="Test") for i in range(2)]
+        db.add_all(categories)
+        await db.commit()
+        category_ids = [c.id for c in categories]
+        try:
+            created = await create_business(
+                BusinessCreate(
+                    email=email,
+                    password="secret",
+                    branch_name=f"Branch {tag}",
+                    phone_number="01 234 567",
+                    address="Beirut",
+                    start_hour="09:00",
+                    categories=category_ids,
+                ),
+                db,
+            )
+
+            assert created.email == email
+            assert created.branch_name == f"Branch {tag}"
+            assert created.phone_number == "01 234 567"
+            assert created.address == "Beirut"
+            assert sorted(created.categories) == sorted(category_ids)
+
+            user = await db.scalar(select(User).filter(User.email == email))
+            assert user.business.id == created.id
+            assert user.password != "secret"
+
+            with pytest.raises(HTTPException) as duplicate:
+                await create_business(
+                    BusinessCreate(
+                        email=email,
+                        password="secret",
+                        branch_name="Other",
+                        categories=category_ids[:1],
+                    ),
+                    db,
+                )
+            assert duplicate.value.status_code == 400
+        finally:
+            user_ids = select(User.id).filter(User.email == email)
+            await db.execute(delete(user_category).where(user_category.c.user_id.in_(user_ids)))
+            await db.execute(delete(Business).where(Business.user_id.in_(user_ids)))
+            await db.execute(delete(User).where(User.email == email))
+            await db.execute(delete(Category).where(Category.id.in_(category_ids)))
+            await db.commit()
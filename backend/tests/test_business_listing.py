@@ -0,0 +1,105 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete, event, insert
+from starlette.requests import Request
+
+from app.api.v1.business import list_businesses
+from app.api.v1.pagination import MAX_LIMIT, PageParams
+from app.core.db import async_session
+from app.model.model import Business, Category, User, user_category
+
+pytestmark = pytest.mark.anyio
+
+
+def _page(query: str = "", **params) -> PageParams:
+    request = Request({"type": "http", "query_string": query.encode(), "headers": []})
+    return PageParams(request, **params)
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.engine = engine.sync_engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+
+async def _seed(db, categories: list[Category], count: int) -> list[User]:
+    users = []
+    for _ in range(count):
+        tag = uuid.uuid4().hex
+        user = User(email=f"{tag}@example.com", username=tag, password="x")
+        user.business = Business(branch_name=f"Branch {tag}")
+        users.append(user)
+    db.add_all(users)
+    await db.flush()
+    await db.execute(
+        insert(user_category),
+        [
+            {"user_id": user.id, "category_id": category.id}
+            for user in users
+            for category in categories
+        ],
+    )
+    await db.commit()
+    return users
+
+
+async def _count_listing_statements(engine) -> int:
+    async with async_session() as db:
+        with StatementCounter(engine) as counter:
+            page = await list_businesses(db, _page(f"limit={MAX_LIMIT}", limit=MAX_LIMIT, cursor=None))
+    assert page.items
+    return counter.count
+
+
+async def test_listing_statement_count_does_not_grow_with_businesses(engine):
+    n = 5
+    async with async_session() as db:
+        categories = [
+            Category(key=f"test-{uuid.uuid4().hex}", name="Test") for _ in range(2)
+        ]
+        db.add_all(categories)
+        await db.commit()
+        users = []
+        try:
+            users += await _seed(db, categories, n)
+            statements = await _count_listing_statements(engine)
+
+            users += await _seed(db, categories, n)
+            assert await _count_listing_statements(engine) == statements
+            assert statements == 1
+        finally:
+            user_ids = [user.id for user in users]
+            await db.execute(delete(user_category).where(user_category.c.user_id.in_(user_ids)))
+            await db.execute(delete(Business).where(Business.user_id.in_(user_ids)))
+            await db.execute(delete(User).where(User.id.in_(user_ids)))
+            await db.execute(
+                delete(Category).where(Category.id.in_([c.id for c in categories]))
+            )
+            await db.commit()
+
+
+@pytest.mark.parametrize(
+    "query, params",
+    [("limit=10", {"limit": 10, "cursor": None}), ("cursor=abc", {"limit": 50, "cursor": "abc"})],
+)
+async def test_ndjson_listing_rejects_paging(query, params):
+    with pytest.raises(HTTPException) as rejected:
+        await list_businesses(None, _page(query, **params), format="ndjson")
+    assert rejected.value.status_code == 400
+
+
+async def test_ndjson_listing_streams_without_paging():
+    response = await list_businesses(None, _page(limit=50, cursor=None), format="ndjson")
+    assert response.media_type == "application/x-ndjson"
@@ -0,0 +1,121 @@
+import asyncio
+import socket
+from email.mime.text import MIMEText
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import delete, select
+
+from app.core.config import MailSettings
+from app.core.db import async_session
+from app.core.mail import EmailConfig, SMTPConnectionPool
+from app.core.mail_queue import MailQueue
+from app.model.model import MailOutbox, MailStatus
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.envelopes = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.envelopes.append(envelope)
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def _pool_for(controller: Controller) -> SMTPConnectionPool:
+    config = EmailConfig()
+    config.smtp_server = controller.hostname
+    config.smtp_port = controller.port
+    config.use_starttls = False
+    config.sender_email = "noreply@example.com"
+    config.sender_password = None
+    return SMTPConnectionPool(config, size=1)
+
+
+def _message(to: str, subject: str) -> MIMEText:
+    message = MIMEText("Hello")
+    message["From"] = "noreply@example.com"
+    message["To"] = to
+    message["Subject"] = subject
+    return message
+
+
+def test_mail_is_enabled_without_a_password():
+    assert MailSettings(SMTP_SENDER_EMAIL="noreply@example.com").mail_enabled
+    assert not MailSettings(SMTP_SENDER_EMAIL=None).mail_enabled
+
+
+async def test_queued_mail_is_delivered_and_marked_sent(engine, smtp_server):
+    controller, handler = smtp_server
+    pool = _pool_for(controller)
+    queue = MailQueue(send_batch=pool.send_batch, workers=1, sweep_interval=0.1)
+    recipients = ["a@example.com", "b@example.com"]
+    ids = []
+    await queue.start()
+    try:
+        async with async_session() as db:
+            ids += await queue.enqueue_many(
+                db, [(_message(to, f"Test {to}"), [to]) for to in recipients]
+            )
+        for _ in range(100):
+            if len(handler.envelopes) == len(recipients):
+                break
+            await asyncio.sleep(0.05)
+        await queue.stop()
+
+        assert sorted(e.rcpt_tos[0] for e in handler.envelopes) == recipients
+        async with async_session() as db:
+            statuses = (
+                await db.scalars(select(MailOutbox.status).where(MailOutbox.id.in_(ids)))
+            ).all()
+        assert statuses == [MailStatus.SENT.value] * len(recipients)
+    finally:
+        await queue.stop()
+        await asyncio.to_thread(pool.close)
+        async with async_session() as db:
+            await db.execute(delete(MailOutbox).where(MailOutbox.id.in_(ids)))
+            await db.commit()
+
+
+async def test_concurrent_workers_send_each_message_once(engine, smtp_server):
+    controller, handler = smtp_server
+    pool = _pool_for(controller)
+    # Two processes sharing the outbox, each handed the same rows.
+    queues = [MailQueue(send_batch=pool.send_batch) for _ in range(2)]
+    recipients = [f"user{i}@example.com" for i in range(5)]
+    ids = []
+    try:
+        async with async_session() as db:
+            ids += await queues[0].enqueue_many(
+                db, [(_message(to, f"Test {to}"), [to]) for to in recipients]
+            )
+        await asyncio.gather(*(queue._deliver(ids) for queue in queues))
+
+        assert sorted(e.rcpt_tos[0] for e in handler.envelopes) == sorted(recipients)
+        async with async_session() as db:
+            statuses = (
+                await db.scalars(select(MailOutbox.status).where(MailOutbox.id.in_(ids)))
+            ).all()
+        assert statuses == [MailStatus.SENT.value] * len(recipients)
+    finally:
+        await asyncio.to_thread(pool.close)
+        async with async_session() as db:
+            await db.execute(delete(MailOutbox).where(MailOutbox.id.in_(ids)))
+            await db.commit()
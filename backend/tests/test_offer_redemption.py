@@ -0,0 +1,59 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+
+from app.api.v1.offer import redeem_offer
+from app.core.db import async_session
+from app.model.model import Business, BusinessOffer, OfferRedemption, User
+
+pytestmark = pytest.mark.anyio
+
+CONCURRENT_SCANS = 20
+
+
+async def _redeem(code: str, user_id: uuid.UUID) -> int:
+    async with async_session() as db:
+        try:
+            await redeem_offer(code, {"id": str(user_id)}, db)
+        except HTTPException as e:
+            return e.status_code
+    return 200
+
+
+async def test_concurrent_redemptions_succeed_once(engine):
+    tag = uuid.uuid4().hex
+    now = datetime.now()
+    async with async_session() as db:
+        user = User(email=f"{tag}@example.com", username=tag, password="x")
+        user.business = Business(branch_name=f"Branch {tag}")
+        offer = BusinessOffer(
+            name=f"Offer {tag}",
+            start_date=now - timedelta(days=1),
+            end_date=now + timedelta(days=1),
+            business=user.business,
+        )
+        db.add_all([user, offer])
+        await db.commit()
+        try:
+            statuses = await asyncio.gather(
+                *(_redeem(offer.redemption_code, user.id) for _ in range(CONCURRENT_SCANS))
+            )
+            assert statuses.count(200) == 1
+            assert statuses.count(409) == CONCURRENT_SCANS - 1
+
+            redemptions = await db.scalar(
+                select(func.count())
+                .select_from(OfferRedemption)
+                .where(OfferRedemption.offer_id == offer.id, OfferRedemption.user_id == user.id)
+            )
+            assert redemptions == 1
+        finally:
+            await db.execute(delete(OfferRedemption).where(OfferRedemption.offer_id == offer.id))
+            await db.execute(delete(BusinessOffer).where(BusinessOffer.id == offer.id))
+            await db.execute(delete(Business).where(Business.user_id == user.id))
+            await db.execute(delete(User).where(User.id == user.id))
+            await db.commit()
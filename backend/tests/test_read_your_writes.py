@@ -0,0 +1,39 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.db import _pinned_to_primary
+from app.core.middleware import ReadYourWritesMiddleware
+from app.core.security import create_access_token
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, window=60)
+
+    @app.post("/write")
+    async def write():
+        return {}
+
+    @app.get("/pinned")
+    async def pinned(request: Request):
+        return await _pinned_to_primary(request)
+
+    return TestClient(app)
+
+
+def _bearer(subject: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': subject})}"}
+
+
+def test_writes_pin_their_subject_without_cookies():
+    client = _client()
+    writer, other = _bearer("writer@example.com"), _bearer("other@example.com")
+    assert client.get("/pinned", headers=writer).json() is False
+
+    response = client.post("/write", headers=writer)
+    client.cookies.clear()
+
+    assert "set-cookie" not in response.headers
+    assert client.get("/pinned", headers=writer).json() is True
+    assert client.get("/pinned", headers=other).json() is False
+    assert client.get("/pinned").json() is False
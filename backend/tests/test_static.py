@@ -0,0 +1,47 @@
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.core.static import CachedStaticFiles, accepted_encodings, brotli
+
+
+@pytest.fixture
+def client(tmp_path):
+    source = b"console.log(1)"
+    (tmp_path / "app.js").write_bytes(source)
+    (tmp_path / "app.js.gz").write_bytes(gzip.compress(source))
+    # Without brotli the client cannot decode br either, so any bytes will do.
+    (tmp_path / "app.js.br").write_bytes(brotli.compress(source) if brotli else source)
+    app = Starlette(routes=[Mount("/static", CachedStaticFiles(directory=tmp_path))])
+    return TestClient(app)
+
+
+def test_accepted_encodings_reads_q_values():
+    assert accepted_encodings("gzip;q=0.5, BR ; q=0, identity, x;q=bad") == {
+        "gzip": 0.5,
+        "br": 0.0,
+        "identity": 1.0,
+        "x": 0.0,
+    }
+
+
+@pytest.mark.parametrize(
+    "header, encoding",
+    [
+        ("gzip, br", "br"),
+        ("br;q=0, gzip", "gzip"),
+        ("br;q=0.5, gzip;q=0.8", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("brotli-ish", None),
+        ("*", "br"),
+        ("*, br;q=0", "gzip"),
+        ("identity", None),
+    ],
+)
+def test_encoding_follows_accept_encoding(client, header, encoding):
+    response = client.get("/static/app.js", headers={"accept-encoding": header})
+    assert response.status_code == 200
+    assert response.headers.get("content-encoding") == encoding
@@ -707,9 +707,19 @@ const Home: React.FC = () => {
   useEffect(() => {
     const fetchBusinesses = async (): Promise<Business[]> => {
       try {
-        const response = await fetch(`http://127.0.0.1:8000/api/v1/businesses/`);
-        if (!response.ok) throw new Error('Failed to fetch businesses');
-        return await response.json();
+        // The listing is keyset-paginated; follow next_cursor until the last page.
+        const businesses: Business[] = [];
+        let cursor: string | null = null;
+        do {
+          const params = new URLSearchParams({ limit: '200' });
+          if (cursor) params.set('cursor', cursor);
+          const response = await fetch(`http://127.0.0.1:8000/api/v1/businesses/?${params}`);
+          if (!response.ok) throw new Error('Failed to fetch businesses');
+          const page: { items: Business[]; next_cursor: string | null } = await response.json();
+          businesses.push(...page.items);
+          cursor = page.next_cursor;
+        } while (cursor);
+        return businesses;
       } catch (err) {
         throw new Error(err instanceof Error ? err.message : 'Unknown error occurred');
       }